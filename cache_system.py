@@ -2,7 +2,7 @@ import logging
 import time
 import json
 import asyncio
-from typing import Dict, Any, Optional, List, Tuple, Union
+from typing import Callable, Dict, Any, Optional, List, Tuple, Union
 from datetime import datetime, timedelta
 import os
 
@@ -371,6 +371,60 @@ async def get_cached_subscription_status(user_id: int) -> Optional[bool]:
     """
     return await get_cached_data("subscription", str(user_id))
 
+# Canal Redis sur lequel les processus du bot s'annoncent les statuts d'abonnement invalidés
+SUBSCRIPTION_INVALIDATION_CHANNEL = "subscription:invalidate"
+
+async def invalidate_subscription_status(user_id: int) -> bool:
+    """
+    Supprime le statut d'abonnement d'un utilisateur du cache partagé et,
+    avec Redis, prévient les autres processus du bot pour qu'ils oublient leur copie locale.
+    
+    Args:
+        user_id (int): ID de l'utilisateur
+        
+    Returns:
+        bool: True si l'opération a réussi
+    """
+    deleted = await cache.delete(f"subscription:{user_id}")
+    
+    if cache.use_redis and cache.redis_client:
+        try:
+            cache.redis_client.publish(SUBSCRIPTION_INVALIDATION_CHANNEL, str(user_id))
+        except Exception as e:
+            logger.error(f"Erreur lors de la publication de l'invalidation d'abonnement: {e}")
+            return False
+    
+    return deleted
+
+def start_subscription_invalidation_listener(on_invalidate: Callable[[int], Any]):
+    """
+    Écoute les invalidations publiées par les autres processus (Redis uniquement).
+    `on_invalidate(user_id)` est appelé dans la boucle asyncio courante.
+    
+    Returns:
+        Le thread d'écoute Redis (à arrêter avec .stop()), ou None sans Redis.
+    """
+    if not (cache.use_redis and cache.redis_client):
+        return None
+    
+    loop = asyncio.get_running_loop()
+    
+    def _handler(message):
+        try:
+            user_id = int(message["data"])
+        except (TypeError, ValueError):
+            return
+        loop.call_soon_threadsafe(on_invalidate, user_id)
+    
+    try:
+        pubsub = cache.redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{SUBSCRIPTION_INVALIDATION_CHANNEL: _handler})
+        # Thread dédié: l'écoute ne bloque ni la boucle ni le pool de threads
+        return pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'abonnement aux invalidations d'abonnement: {e}")
+        return None
+
 async def cache_referral_count(user_id: int, count: int) -> bool:
     """
     Cache le nombre de parrainages d'un utilisateur.
@@ -396,6 +450,36 @@ async def get_cached_referral_count(user_id: int) -> Optional[int]:
     """
     return await get_cached_data("referral", str(user_id))
 
+# Copie locale (mémoire du processus) des prédictions récentes, consultée avant le cache
+# partagé: {(équipe 1, équipe 2, cote 1, cote 2): (horodatage monotone, prédiction)}
+_prediction_local_cache: Dict[Tuple[str, str, Optional[float], Optional[float]], Tuple[float, Dict]] = {}
+PREDICTION_LOCAL_TTL = 600  # secondes
+PREDICTION_LOCAL_MAX_SIZE = 4096  # Nombre maximal de prédictions gardées en mémoire
+
+def _prediction_local_key(team1: str, team2: str, odds1: Optional[float], odds2: Optional[float]) -> Tuple[str, str, Optional[float], Optional[float]]:
+    """Clé du cache local: noms sans distinction de casse, cotes arrondies au centième."""
+    return (
+        team1.lower(),
+        team2.lower(),
+        round(odds1, 2) if odds1 is not None else None,
+        round(odds2, 2) if odds2 is not None else None
+    )
+
+def _remember_prediction(key: Tuple[str, str, Optional[float], Optional[float]], prediction: Dict) -> None:
+    """Enregistre une prédiction dans le cache local en bornant sa taille."""
+    now = time.monotonic()
+    # Réinsérer la clé pour que l'ordre du dict reste celui des mises à jour
+    _prediction_local_cache.pop(key, None)
+    _prediction_local_cache[key] = (now, prediction)
+    
+    if len(_prediction_local_cache) > PREDICTION_LOCAL_MAX_SIZE:
+        # Supprimer d'abord les entrées expirées, puis les plus anciennes si besoin
+        expired = [k for k, (ts, _) in _prediction_local_cache.items() if now - ts >= PREDICTION_LOCAL_TTL]
+        for k in expired:
+            del _prediction_local_cache[k]
+        while len(_prediction_local_cache) > PREDICTION_LOCAL_MAX_SIZE:
+            del _prediction_local_cache[next(iter(_prediction_local_cache))]
+
 async def cache_prediction(team1: str, team2: str, odds1: Optional[float], odds2: Optional[float], prediction: Dict) -> bool:
     """
     Cache une prédiction pour un match.
@@ -415,6 +499,7 @@ async def cache_prediction(team1: str, team2: str, odds1: Optional[float], odds2
     odds2_str = f"{odds2:.2f}" if odds2 is not None else "None"
     key = f"{team1}_{team2}_{odds1_str}_{odds2_str}"
     
+    _remember_prediction(_prediction_local_key(team1, team2, odds1, odds2), prediction)
     return await set_cached_data("prediction", key, prediction)
 
 async def get_cached_prediction(team1: str, team2: str, odds1: Optional[float], odds2: Optional[float]) -> Optional[Dict]:
@@ -430,12 +515,21 @@ async def get_cached_prediction(team1: str, team2: str, odds1: Optional[float],
     Returns:
         Dict: Prédiction ou None si non trouvée
     """
+    # Vérifier d'abord le cache local (aucun aller-retour réseau)
+    local_key = _prediction_local_key(team1, team2, odds1, odds2)
+    local_entry = _prediction_local_cache.get(local_key)
+    if local_entry is not None and time.monotonic() - local_entry[0] < PREDICTION_LOCAL_TTL:
+        return local_entry[1]
+    
     # Créer une clé unique pour cette prédiction
     odds1_str = f"{odds1:.2f}" if odds1 is not None else "None"
     odds2_str = f"{odds2:.2f}" if odds2 is not None else "None"
     key = f"{team1}_{team2}_{odds1_str}_{odds2_str}"
     
-    return await get_cached_data("prediction", key)
+    prediction = await get_cached_data("prediction", key)
+    if prediction is not None:
+        _remember_prediction(local_key, prediction)
+    return prediction
 
 async def cache_teams(teams: List[str]) -> bool:
     """
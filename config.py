@@ -3,6 +3,7 @@ import json
 import tempfile
 from pathlib import Path
 import logging
+from enum import IntEnum
 
 # Configuration du logging
 logging.basicConfig(
@@ -19,6 +20,17 @@ def get_env_variable(name, default=None):
 # Token fourni par BotFather (utilise la variable d'environnement)
 TELEGRAM_TOKEN = get_env_variable('TELEGRAM_TOKEN', '')
 
+# Webhook (facultatif): si WEBHOOK_URL est défini (URL publique complète, ex:
+# https://fifa-predictor-bot.onrender.com/webhook), fifa_bot.py reçoit les mises à jour
+# par webhook; sinon il utilise le long polling (développement local)
+WEBHOOK_URL = get_env_variable('WEBHOOK_URL', '')
+WEBHOOK_PORT = int(get_env_variable('PORT', 8443))
+WEBHOOK_SECRET = get_env_variable('WEBHOOK_SECRET')  # En-tête X-Telegram-Bot-Api-Secret-Token
+
+# Fichier de persistance du bot (conversations en cours et user_data, conservés après un redémarrage)
+BOT_PERSISTENCE_FILE = get_env_variable('BOT_PERSISTENCE_FILE', 'fifa_bot_state.pkl')
+BOT_PERSISTENCE_INTERVAL = 30  # secondes entre deux écritures du fichier
+
 # Configuration MongoDB (principale)
 MONGODB_URI = get_env_variable('MONGODB_URI', '')
 MONGODB_DB_NAME = get_env_variable('MONGODB_DB_NAME', 'fifa_predictor_db')
@@ -67,6 +79,12 @@ TEAM_INPUT = 1
 ODDS_INPUT = 2
 ENTERING_ODDS = 3
 
+# Étape de la saisie des cotes, mémorisée dans user_data["flow"] (une seule clé au lieu de deux drapeaux)
+class Flow(IntEnum):
+    IDLE = 0
+    AWAIT_ODDS1 = 1
+    AWAIT_ODDS2 = 2
+
 # Messages du bot
 WELCOME_MESSAGE = """
 👋 Bienvenue sur FIFA 4x4 Predictor!
@@ -106,6 +124,7 @@ MAX_REFERRALS = 1  # Un seul parrainage par utilisateur
 CACHE_EXPIRE_SECONDS = 300  # 5 minutes de cache pour réduire les appels à la BD
 REQUEST_THROTTLE_MS = 500  # Limiter les requêtes fréquentes (en millisecondes)
 MAX_CONCURRENT_USERS = 200  # Limite théorique d'utilisateurs simultanés
+CONCURRENT_UPDATES = 256  # Mises à jour Telegram traitées en parallèle par l'application
 
 # Paramètres d'animation pour l'interface
 ANIMATION_FAST = True  # Réduit les délais d'animation pour une meilleure réactivité
@@ -1,6 +1,7 @@
 import logging
 import os
 import time
+import random
 import asyncio
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
@@ -12,11 +13,12 @@ from cache_system import (
     get_cached_teams, cache_teams,
     get_cached_matches, cache_matches,
     get_cached_subscription_status, cache_subscription_status,
+    invalidate_subscription_status, start_subscription_invalidation_listener,
     get_cached_referral_count, cache_referral_count
 )
 
 # Système de file d'attente pour les opérations de base de données
-from queue_manager import queue_manager
+from queue_manager import queue_manager, subscription_rate_limiter, get_shared_bot
 
 # Configuration du logging
 logging.basicConfig(
@@ -87,6 +89,67 @@ else:
 _users_batch_queue = []  # Liste des utilisateurs en attente d'enregistrement
 _last_batch_processing = time.time()  # Heure du dernier traitement par lots
 
+# File d'attente pour l'écriture des logs de prédiction par lots
+_prediction_log_queue = None  # asyncio.Queue créée à la première utilisation
+_prediction_log_worker_task = None  # Tâche prediction_log_worker() en cours
+PREDICTION_LOG_QUEUE_SIZE = 10000  # Nombre maximal de logs en attente
+PREDICTION_LOG_BATCH_SIZE = 100  # Nombre maximal de logs par écriture
+PREDICTION_LOG_FLUSH_INTERVAL = 2.0  # Délai maximal (secondes) avant l'écriture d'un lot incomplet
+
+# Tâches d'écriture de logs individuels en cours (références fortes)
+_pending_log_tasks = set()
+
+# Reprises de la vérification d'abonnement après une erreur 429. Le limiteur de débit de
+# l'application (AIORateLimiter) réessaie déjà getChatMember: une seule reprise ici, et
+# seulement tant que l'attente cumulée reste sous SUBSCRIPTION_CHECK_MAX_WAIT
+SUBSCRIPTION_CHECK_MAX_RETRIES = 1
+SUBSCRIPTION_CHECK_MAX_WAIT = 5.0  # secondes
+
+# Cache local (mémoire du processus) des statuts d'abonnement: {user_id: (horodatage monotone, statut)}
+_subscription_local_cache: Dict[int, Tuple[float, bool]] = {}
+SUBSCRIPTION_LOCAL_TTL = 60  # secondes
+SUBSCRIPTION_LOCAL_MAX_SIZE = 10000  # Nombre maximal d'utilisateurs gardés en mémoire
+
+def _remember_subscription(user_id: int, is_subscribed: bool, now: float) -> None:
+    """Enregistre un statut dans le cache local en bornant sa taille."""
+    # Réinsérer la clé pour que l'ordre du dict reste celui des mises à jour
+    _subscription_local_cache.pop(user_id, None)
+    _subscription_local_cache[user_id] = (now, is_subscribed)
+    
+    if len(_subscription_local_cache) > SUBSCRIPTION_LOCAL_MAX_SIZE:
+        # Supprimer d'abord les entrées expirées, puis les plus anciennes si besoin
+        expired = [uid for uid, (ts, _) in _subscription_local_cache.items() if now - ts >= SUBSCRIPTION_LOCAL_TTL]
+        for uid in expired:
+            del _subscription_local_cache[uid]
+        while len(_subscription_local_cache) > SUBSCRIPTION_LOCAL_MAX_SIZE:
+            del _subscription_local_cache[next(iter(_subscription_local_cache))]
+
+def get_local_subscription_status(user_id: int) -> Optional[bool]:
+    """Retourne le statut d'abonnement du cache local s'il est encore valide, sinon None (aucun appel réseau)."""
+    entry = _subscription_local_cache.get(user_id)
+    if entry is not None and time.monotonic() - entry[0] < SUBSCRIPTION_LOCAL_TTL:
+        return entry[1]
+    return None
+
+def _forget_subscription(user_id: int) -> None:
+    """Retire un utilisateur du cache local (invalidation reçue d'un autre processus)."""
+    _subscription_local_cache.pop(user_id, None)
+
+async def invalidate_user_subscription(user_id: int) -> None:
+    """
+    Oublie le statut d'abonnement connu d'un utilisateur: cache local, cache partagé
+    et, avec Redis, copies locales des autres processus du bot.
+    """
+    _forget_subscription(user_id)
+    await invalidate_subscription_status(user_id)
+
+def start_subscription_invalidation_sync():
+    """
+    Applique au cache local les invalidations publiées par les autres processus.
+    Retourne le thread d'écoute Redis à arrêter avec .stop(), ou None sans Redis.
+    """
+    return start_subscription_invalidation_listener(_forget_subscription)
+
 # Fonction pour obtenir une connexion à la base de données
 def get_database():
     """Récupère une connexion à la base de données active"""
@@ -315,6 +378,46 @@ def get_all_teams():
         finally:
             new_loop.close()
 
+async def get_all_matches_data_async():
+    """
+    Version asynchrone de get_all_matches_data, utilisable depuis la boucle du bot.
+    La lecture bloquante de la base de données est exécutée dans un thread.
+    """
+    # Vérifier d'abord le cache
+    cached_matches = await get_cached_matches()
+    if cached_matches:
+        return cached_matches
+    
+    try:
+        matches = await asyncio.to_thread(db.get_all_matches_data)
+        if matches:
+            # Mettre en cache pour les requêtes futures
+            await cache_matches(matches)
+        return matches or []
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des matchs: {e}")
+        return []
+
+async def get_all_teams_async():
+    """
+    Version asynchrone de get_all_teams, utilisable depuis les gestionnaires du bot.
+    La requête bloquante à la base de données est exécutée dans un thread.
+    """
+    # Vérifier d'abord le cache
+    cached_teams = await get_cached_teams()
+    if cached_teams:
+        return cached_teams
+    
+    try:
+        teams = await asyncio.to_thread(db.get_all_teams)
+        if teams:
+            # Mettre en cache pour les requêtes futures
+            await cache_teams(teams)
+        return teams or []
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des équipes: {e}")
+        return []
+
 def get_team_statistics(matches):
     """Calcule les statistiques pour chaque équipe"""
     try:
@@ -354,15 +457,181 @@ def save_prediction_log(user_id, username, team1, team2, odds1=None, odds2=None,
     """
     async def _save_prediction_log_async():
         try:
-            return db.save_prediction_log(user_id, username, team1, team2, odds1, odds2, prediction_result)
+            # Écriture synchrone exécutée dans un thread pour ne pas bloquer la boucle
+            return await asyncio.to_thread(
+                db.save_prediction_log, user_id, username, team1, team2, odds1, odds2, prediction_result
+            )
         except Exception as e:
             logger.error(f"Erreur lors de l'enregistrement de la prédiction: {e}")
             return False
     
-    # Ajouter à la file d'attente avec basse priorité (pas critique)
-    asyncio.create_task(queue_manager.add_low_priority(_save_prediction_log_async))
+    # Ajouter à la file d'attente avec basse priorité (pas critique), sans attendre l'écriture
+    task = asyncio.create_task(queue_manager.add_low_priority(_save_prediction_log_async))
+    # Garder une référence jusqu'à la fin de la tâche (sinon elle peut être collectée en cours de route)
+    _pending_log_tasks.add(task)
+    task.add_done_callback(_pending_log_tasks.discard)
     return True
 
+def _get_prediction_log_queue():
+    """Crée la file des logs de prédiction à la première utilisation (dans la boucle active)"""
+    global _prediction_log_queue
+    if _prediction_log_queue is None:
+        _prediction_log_queue = asyncio.Queue(maxsize=PREDICTION_LOG_QUEUE_SIZE)
+    return _prediction_log_queue
+
+def start_prediction_log_worker():
+    """
+    Démarre prediction_log_worker() dans la boucle active s'il ne tourne pas déjà.
+
+    Returns:
+        asyncio.Task: La tâche d'écriture par lots
+    """
+    global _prediction_log_worker_task
+    if _prediction_log_worker_task is None or _prediction_log_worker_task.done():
+        _prediction_log_worker_task = asyncio.create_task(prediction_log_worker())
+    return _prediction_log_worker_task
+
+def queue_prediction_log(user_id, username, team1, team2, odds1=None, odds2=None, prediction_result=None):
+    """
+    Ajoute un log de prédiction à la file d'écriture par lots sans bloquer l'appelant.
+    Les logs sont écrits en base par prediction_log_worker(), démarré au besoin.
+
+    Returns:
+        bool: True si le log a été mis en file, False si la file est pleine
+    """
+    try:
+        start_prediction_log_worker()
+        _get_prediction_log_queue().put_nowait({
+            "user_id": user_id,
+            "username": username,
+            "team1": team1,
+            "team2": team2,
+            "odds1": odds1,
+            "odds2": odds2,
+            "prediction_result": prediction_result
+        })
+        return True
+    except asyncio.QueueFull:
+        logger.warning(f"File des logs de prédiction pleine, log ignoré pour {username} (ID: {user_id})")
+        return False
+
+async def save_prediction_logs_bulk(entries):
+    """
+    Enregistre un lot de logs de prédiction en une seule opération si la base le permet.
+
+    Args:
+        entries (list): Liste de dictionnaires produits par queue_prediction_log()
+
+    Returns:
+        bool: True si l'opération a réussi, False sinon
+    """
+    try:
+        if hasattr(db, "save_prediction_logs_bulk"):
+            return await asyncio.to_thread(db.save_prediction_logs_bulk, entries)
+
+        # Base sans écriture groupée: enregistrer les logs un par un
+        for entry in entries:
+            await asyncio.to_thread(db.save_prediction_log, **entry)
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement groupé des prédictions: {e}")
+        return False
+
+async def prediction_log_worker():
+    """
+    Tâche de fond qui vide la file des logs de prédiction par lots.
+    Un lot est écrit dès qu'il atteint PREDICTION_LOG_BATCH_SIZE entrées ou
+    PREDICTION_LOG_FLUSH_INTERVAL secondes après sa première entrée.
+    """
+    log_queue = _get_prediction_log_queue()
+    batch = []
+    write_task = None
+
+    try:
+        while True:
+            batch = [await log_queue.get()]
+            deadline = time.monotonic() + PREDICTION_LOG_FLUSH_INTERVAL
+
+            while len(batch) < PREDICTION_LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(log_queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            to_save, batch = batch, []
+            # Écriture protégée: une annulation pendant l'écriture n'interrompt pas ce lot
+            write_task = asyncio.ensure_future(save_prediction_logs_bulk(to_save))
+            await asyncio.shield(write_task)
+            write_task = None
+            logger.info(f"Lot de {len(to_save)} log(s) de prédiction enregistré")
+    except asyncio.CancelledError:
+        # Terminer l'écriture du lot déjà lancé (ni perdu, ni écrit deux fois)
+        if write_task is not None:
+            await write_task
+        # Remettre le lot en cours de constitution dans la file pour flush_prediction_logs()
+        for entry in batch:
+            try:
+                log_queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                break
+        logger.info("Écriture des logs de prédiction arrêtée")
+        raise
+
+async def flush_prediction_logs():
+    """
+    Écrit immédiatement tous les logs de prédiction encore en file (à appeler à l'arrêt du bot).
+
+    Returns:
+        int: Nombre de logs écrits
+    """
+    log_queue = _get_prediction_log_queue()
+    entries = []
+    while not log_queue.empty():
+        entries.append(log_queue.get_nowait())
+
+    for i in range(0, len(entries), PREDICTION_LOG_BATCH_SIZE):
+        await save_prediction_logs_bulk(entries[i:i + PREDICTION_LOG_BATCH_SIZE])
+
+    if entries:
+        logger.info(f"{len(entries)} log(s) de prédiction en attente enregistré(s) à l'arrêt")
+    return len(entries)
+
+async def rate_limited_check(user_id):
+    """
+    Appelle la vérification d'abonnement (getChatMember) à travers le limiteur adaptatif.
+    Sur une erreur 429, réduit le débit, attend le délai imposé par Telegram puis réessaie
+    (SUBSCRIPTION_CHECK_MAX_RETRIES fois au plus, SUBSCRIPTION_CHECK_MAX_WAIT secondes d'attente au total).
+
+    Args:
+        user_id (int): L'ID de l'utilisateur Telegram à vérifier
+
+    Returns:
+        bool: True si l'utilisateur est abonné, False sinon
+    """
+    from telegram.error import RetryAfter
+
+    waited = 0.0
+    for attempt in range(SUBSCRIPTION_CHECK_MAX_RETRIES + 1):
+        await subscription_rate_limiter.acquire()
+        try:
+            is_subscribed = await db.check_user_subscription(user_id)
+            subscription_rate_limiter.on_success()
+            return is_subscribed
+        except RetryAfter as e:
+            subscription_rate_limiter.on_throttled()
+            retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else e.retry_after
+            # Ne pas faire attendre le gestionnaire au-delà du plafond
+            if attempt == SUBSCRIPTION_CHECK_MAX_RETRIES or waited + retry_after > SUBSCRIPTION_CHECK_MAX_WAIT:
+                break
+            delay = retry_after + random.uniform(0, 0.5)
+            await asyncio.sleep(delay)
+            waited += delay
+
+    raise RuntimeError(f"Vérification d'abonnement abandonnée (limite de débit Telegram, {waited:.1f} s d'attente)")
+
 async def check_user_subscription(user_id):
     """
     Vérifie si un utilisateur est abonné au canal.
@@ -386,17 +655,24 @@ async def check_user_subscription(user_id):
     except Exception as e:
         logger.error(f"Erreur lors de la vérification du statut admin: {e}")
     
+    # Vérifier d'abord le cache local (aucun aller-retour réseau)
+    local_status = get_local_subscription_status(user_id)
+    if local_status is not None:
+        return local_status
+    
     # Vérifier le cache
     cached_status = await get_cached_subscription_status(user_id)
     if cached_status is not None:
         logger.info(f"Utilisation du cache pour la vérification d'abonnement de l'utilisateur {user_id}")
+        _remember_subscription(user_id, cached_status, time.monotonic())
         return cached_status
     
     # Vérification via la base de données active
     try:
-        is_subscribed = await db.check_user_subscription(user_id)
+        is_subscribed = await rate_limited_check(user_id)
         # Mettre en cache (24h)
         await cache_subscription_status(user_id, is_subscribed)
+        _remember_subscription(user_id, is_subscribed, time.monotonic())
         return is_subscribed
     except Exception as e:
         logger.error(f"Erreur lors de la vérification d'abonnement: {e}")
@@ -508,10 +784,7 @@ async def verify_and_update_referral(user_id, referrer_id):
                     
                     # Notification au parrain
                     try:
-                        from telegram import Bot
-                        from config import TELEGRAM_TOKEN
-                        
-                        bot = Bot(token=TELEGRAM_TOKEN)
+                        bot = get_shared_bot()
                         referral_count = await count_referrals(referrer_id)
                         
                         from referral_system import get_max_referrals
@@ -1,41 +1,59 @@
 import logging
+import math
 import re
 import asyncio
 import time
-from typing import Dict, List, Optional, Tuple, Any
+from collections import OrderedDict
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from itertools import groupby
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.helpers import escape_markdown
+from telegram.request import HTTPXRequest
 from telegram.ext import (
+    AIORateLimiter,
     Application,
+    ApplicationHandlerStop,
+    TypeHandler,
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
     ConversationHandler,
+    PersistenceInput,
+    PicklePersistence,
     filters,
     ContextTypes
 )
 
 # Configuration
-from config import TELEGRAM_TOKEN, WELCOME_MESSAGE, HELP_MESSAGE, TEAM_INPUT, ODDS_INPUT
+from config import (
+    TELEGRAM_TOKEN, WELCOME_MESSAGE, HELP_MESSAGE, CONCURRENT_UPDATES, TEAM_INPUT, ODDS_INPUT, Flow,
+    BOT_PERSISTENCE_FILE, BOT_PERSISTENCE_INTERVAL, WEBHOOK_URL, WEBHOOK_PORT, WEBHOOK_SECRET
+)
 
 # Gestionnaires optimisés
 from queue_manager import (
     send_message_queued, edit_message_queued, 
-    get_system_load_status, start_queue_manager
+    get_system_load_status, start_queue_manager, set_shared_bot
 )
 from gif_animations import (
     send_verification_animation, send_prediction_animation,
     send_game_animation
 )
 from cache_system import (
-    get_cached_subscription_status, cache_subscription_status,
     get_cached_referral_count, cache_referral_count,
-    get_cached_teams, cache_teams,
     get_cached_prediction, cache_prediction
 )
 
 # Modules existants
-from database_adapter import get_all_teams, save_prediction_log, check_user_subscription
-from predictor import MatchPredictor, format_prediction_message
+from database_adapter import (
+    get_all_teams_async, check_user_subscription,
+    queue_prediction_log, start_prediction_log_worker, flush_prediction_logs,
+    start_subscription_invalidation_sync
+)
+from predictor import get_match_predictor, format_prediction_message, preload_prediction_data
 from referral_system import (
     register_user, has_completed_referrals, generate_referral_link,
     count_referrals, get_referred_users, MAX_REFERRALS, get_referral_instructions
@@ -50,6 +68,9 @@ from admin_access import is_admin
 # Initialisation du système
 from games import ensure_initialization
 
+# Repli /cancel et détection des demandes de match partagés avec fifa_games.py
+from games.fifa_game import cancel_command, is_match_request
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -57,36 +78,294 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialisation du prédicteur
-predictor = MatchPredictor()
-
 # États de conversation
 VERIFY_SUBSCRIPTION = 1
 TEAM_SELECTION = 2
 ODDS_INPUT_TEAM1 = 3
 ODDS_INPUT_TEAM2 = 4
 
+# Tâches lancées sans attente (référence conservée jusqu'à leur fin)
+_background_tasks = set()
+
+def _on_background_task_done(task: asyncio.Task) -> None:
+    """Libère la référence d'une tâche de fond et journalise son éventuelle erreur."""
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Erreur dans une tâche de fond: {task.exception()}")
+
+def _fire_and_forget(coro) -> asyncio.Task:
+    """Lance une coroutine en arrière-plan sans bloquer le gestionnaire."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
+
+# Délai (secondes) en dessous duquel une prédiction est envoyée sans message d'attente
+FAST_PREDICTION_DELAY = 0.3
+
+# Nombre de threads pour les appels bloquants (base de données, API externes)
+BLOCKING_IO_WORKERS = 8
+
+# Début du token affiché dans les logs (jamais le token complet)
+TOKEN_PREFIX = TELEGRAM_TOKEN[:5]
+
+# Connexions HTTP vers l'API Telegram (pool persistant, HTTP/2)
+BOT_CONNECTION_POOL_SIZE = 32
+
+# Long polling: Telegram garde getUpdates ouvert jusqu'à cette durée (secondes) tant
+# qu'aucune mise à jour n'arrive; le délai de lecture HTTP doit rester au-dessus
+POLLING_TIMEOUT = 30
+GET_UPDATES_READ_TIMEOUT = POLLING_TIMEOUT + 5
+
 # Constantes pour la pagination des équipes
 TEAMS_PER_PAGE = 8
 
+# Filtre des messages texte hors commandes (composé une seule fois, partagé par les gestionnaires)
+TEXT_NON_COMMAND = filters.TEXT & ~filters.COMMAND
+
+# Claviers inline statiques (construits une seule fois au chargement du module)
+_NEW_PREDICTION_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Nouvelle prédiction", callback_data="new_prediction")]
+])
+_START_PREDICTION_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🏆 Sélectionner les équipes", callback_data="start_prediction")]
+])
+_INTERACTIVE_PREDICTION_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔮 Faire une prédiction", callback_data="start_prediction")]
+])
+_REFERRAL_LINK_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔗 Copier le lien", callback_data="copy_referral_link")],
+    [InlineKeyboardButton("✅ Vérifier mon parrainage", callback_data="verify_referral")]
+])
+_COPY_REFERRAL_LINK_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔗 Copier le lien", callback_data="copy_referral_link")]
+])
+_FIFA_GAME_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("👉 Sélectionner les équipes", callback_data="start_prediction")],
+    [InlineKeyboardButton("🎮 Retour au menu", callback_data="show_games")]
+])
+_APPLE_GAME_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔮 Obtenir une prédiction", callback_data="apple_predict")],
+    [InlineKeyboardButton("🎮 Retour au menu", callback_data="show_games")]
+])
+_BACCARAT_GAME_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔢 Entrer le numéro de tour", callback_data="baccarat_enter_tour")],
+    [InlineKeyboardButton("🎮 Retour au menu", callback_data="show_games")]
+])
+_WELCOME_VERIFY_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔍 Vérifier mon abonnement", callback_data="verify_subscription")]
+])
+_WELCOME_VERIFY_REFERRAL_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔍 Vérifier mon abonnement", callback_data="verify_subscription")],
+    [InlineKeyboardButton("🔗 Obtenir mon lien de parrainage", callback_data="get_referral_link")]
+])
+
+# Format accepté pour une cote: nombre décimal avec point ou virgule ("1.85", "1,85", "2")
+_ODDS_RE = re.compile(r'\d+(?:[.,]\d+)?')
+
+# Réponse aux messages qui ne sont ni une commande ni une demande de match
+_DEFAULT_REPLY = "Je ne comprends pas cette commande. Utilisez /help pour voir les commandes disponibles."
+
+# Modèles de messages (construits une seule fois, remplis avec str.format)
+_TPL_SYSTEM_BUSY = (
+    "⚠️ *Système actuellement très sollicité*\n\n"
+    "Temps d'attente estimé: *{wait:.1f} secondes*\n"
+    "Merci de votre patience!"
+)
+_TPL_TEAM1_SELECTED = "✅ *{team}* sélectionné!\n\nChargement des options pour l'équipe adverse..."
+_TPL_TEAM2_SELECTED = "✅ *{team}* sélectionné!\n\nPréparation de la saisie des cotes..."
+_TPL_ODDS_PROMPT_TEAM1 = (
+    "💰 *Saisie des cotes (obligatoire)*\n\n"
+    "Match: *{t1}* vs *{t2}*\n\n"
+    "Veuillez saisir la cote pour *{t1}*\n\n"
+    "_Exemple: 1.85_"
+)
+_TPL_ODDS_PROMPT_TEAM2 = (
+    "💰 *Saisie des cotes (obligatoire)*\n\n"
+    "Match: *{t1}* vs *{t2}*\n\n"
+    "Veuillez maintenant saisir la cote pour *{t2}*\n\n"
+    "_Exemple: 2.35_"
+)
+_TPL_ODDS_SAVED = "✅ Cote de *{team}* enregistrée: *{odds}*"
+_TPL_ODDS_FORMAT_ERROR = (
+    "❌ *Format incorrect*\n\n"
+    "Veuillez saisir uniquement la valeur numérique de la cote pour *{team}*.\n\n"
+    "Exemple: `{example}`"
+)
+_TPL_PREDICTION_ERROR = (
+    "❌ *Erreur de prédiction*\n\n"
+    "{error}\n\n"
+    "Veuillez essayer avec d'autres équipes."
+)
+_TPL_TEAMS_PAGE = (
+    "🏆 *Sélection des équipes* (Page {page}/{total})\n\n"
+    "Veuillez sélectionner la *{team_type} équipe* pour votre prédiction:"
+)
+
+# Messages entièrement statiques
+_MSG_SELECTION_ERROR = (
+    "❌ *Erreur de sélection*\n\n"
+    "Veuillez recommencer la procédure de sélection des équipes."
+)
+_MSG_INVALID_ODDS = (
+    "❌ *Valeur de cote invalide*\n\n"
+    "La cote doit être supérieure à 1.01."
+)
+_MSG_ANALYSIS_IN_PROGRESS = "🧠 *Analyse des données en cours...*"
+_MSG_GENERIC_ERROR = "Désolé, une erreur s'est produite. Veuillez réessayer ou contacter l'administrateur."
+_MSG_NO_TEAMS_AVAILABLE = "Aucune équipe disponible. Veuillez contacter l'administrateur."
+_MSG_TEAM1_REQUIRED = "❌ *Erreur*\n\nVeuillez d'abord sélectionner la première équipe."
+_MSG_READY_FOR_PREDICTION = (
+    "🔮 *Prêt pour une prédiction*\n\n"
+    "Cliquez sur le bouton ci-dessous pour commencer."
+)
+_MSG_NEW_PREDICTION = (
+    "🔮 *Nouvelle prédiction*\n\n"
+    "Cliquez sur le bouton ci-dessous pour commencer."
+)
+_MSG_INTERACTIVE_METHOD = (
+    "ℹ️ *Nouvelle méthode de prédiction*\n\n"
+    "Pour une expérience améliorée, veuillez utiliser notre système interactif de prédiction.\n\n"
+    "Cliquez sur le bouton ci-dessous pour commencer une prédiction guidée avec sélection d'équipes et cotes obligatoires."
+)
+_MSG_PREDICTION_FAILED = (
+    "❌ *Une erreur s'est produite lors de la génération de la prédiction*\n\n"
+    "Veuillez réessayer avec d'autres équipes ou contacter l'administrateur."
+)
+_MSG_WELCOME = (
+    "✅ *Compte activé!*\n\n"
+    "🏆 Bienvenue sur *FIFA 4x4 Predictor*!\n\n"
+    "⚠️ Pour utiliser toutes les fonctionnalités, vous devez être abonné "
+    "à notre canal [AL VE CAPITAL](https://t.me/alvecapitalofficiel)."
+)
+_MSG_HELP_ADMIN = (
+    "*🔮 FIFA 4x4 Predictor - Aide (Admin)*\n\n"
+    "*Commandes disponibles:*\n"
+    "• `/start` - Démarrer le bot\n"
+    "• `/help` - Afficher ce message d'aide\n"
+    "• `/predict` - Commencer une prédiction\n"
+    "• `/teams` - Voir toutes les équipes disponibles\n"
+    "• `/check` - Vérifier l'état du système\n"
+    "• `/games` - Menu des jeux disponibles\n"
+    "• `/admin` - Commandes administrateur\n"
+)
+_MSG_HELP = (
+    "*🔮 FIFA 4x4 Predictor - Aide*\n\n"
+    "*Commandes disponibles:*\n"
+    "• `/start` - Démarrer le bot\n"
+    "• `/help` - Afficher ce message d'aide\n"
+    "• `/predict` - Commencer une prédiction\n"
+    "• `/teams` - Voir toutes les équipes disponibles\n"
+    "• `/check` - Vérifier votre abonnement\n"
+    "• `/referral` - Gérer vos parrainages\n"
+    "• `/games` - Menu des jeux disponibles\n\n"
+    "*Note:* Les cotes sont obligatoires pour obtenir des prédictions précises.\n\n"
+    "Pour plus de détails, contactez l'administrateur du bot."
+)
+
+def _parse_odds(text: str) -> Optional[float]:
+    """Convertit la saisie d'une cote ("1.85" ou "1,85") en float, ou None si le format est invalide."""
+    text = text.strip()
+    # fullmatch écarte aussi ce que float() accepterait à tort ("nan", "inf", "1e5", "1_0")
+    if not _ODDS_RE.fullmatch(text):
+        return None
+    odds = float(text.replace(",", "."))
+    # Un nombre de chiffres démesuré donne inf
+    return odds if math.isfinite(odds) else None
+
+# Identifiants courts des équipes pour les callback_data (limite Telegram: 64 octets)
+_ID2TEAM: List[str] = []
+_TEAM2ID: Dict[str, int] = {}
+# Équipes de la liste actuelle (les identifiants restent attribués aux équipes retirées)
+_known_teams: FrozenSet[str] = frozenset()
+
+def _index_teams(teams: List[str]) -> None:
+    """Attribue un identifiant entier stable à chaque nouvelle équipe."""
+    for team in teams:
+        if team not in _TEAM2ID:
+            _TEAM2ID[team] = len(_ID2TEAM)
+            _ID2TEAM.append(team)
+
+# Copie locale de la liste des équipes, partagée par toutes les pages de sélection.
+# Chargée au démarrage puis rafraîchie en arrière-plan avant d'expirer (voir post_init)
+TEAMS_SNAPSHOT_TTL = 300  # secondes
+TEAMS_REFRESH_INTERVAL = 240  # secondes
+_teams_snapshot: List[str] = []
+_teams_snapshot_time = 0.0
+
+async def _refresh_teams() -> List[str]:
+    """Recharge la liste des équipes (cache puis base de données), l'indexe et remplace la copie locale."""
+    global _teams_snapshot, _teams_snapshot_time, _known_teams
+    
+    teams = await get_all_teams_async()
+    
+    if teams:
+        _index_teams(teams)
+        _teams_snapshot = teams
+        _known_teams = frozenset(teams)
+        _teams_snapshot_time = time.monotonic()
+    
+    return teams or []
+
+async def _load_teams() -> List[str]:
+    """Récupère la liste des équipes: copie locale si elle est récente, sinon rechargement."""
+    # Chaque clic de sélection/pagination réutilise la copie locale tant qu'elle est récente
+    if _teams_snapshot and time.monotonic() - _teams_snapshot_time < TEAMS_SNAPSHOT_TTL:
+        return _teams_snapshot
+    
+    return await _refresh_teams()
+
+async def _refresh_teams_periodically() -> None:
+    """Tâche de fond: recharge la liste des équipes avant l'expiration de la copie locale."""
+    while True:
+        try:
+            await _refresh_teams()
+        except Exception as e:
+            logger.error(f"Erreur lors du rechargement de la liste des équipes: {e}")
+        await asyncio.sleep(TEAMS_REFRESH_INTERVAL)
+
+async def _team_from_id(team_id: str) -> Optional[str]:
+    """Retrouve le nom d'une équipe à partir de l'identifiant d'un callback "s1_<id>" / "s2_<id>"."""
+    try:
+        team_id = int(team_id)
+    except ValueError:
+        return None
+    
+    # Copie locale récente (aucun appel réseau); après un redémarrage, reconstruit l'index
+    await _load_teams()
+    
+    if 0 <= team_id < len(_ID2TEAM):
+        team = _ID2TEAM[team_id]
+        # Écarter une équipe retirée de la liste depuis l'affichage du clavier
+        if team in _known_teams:
+            return team
+    return None
+
+def _remember_user(user_data: Dict[str, Any], user_id: int, username: Optional[str]) -> None:
+    """Mémorise l'identité de l'utilisateur dans user_data, sans réécrire des valeurs inchangées."""
+    if user_data.get("user_id") != user_id:
+        user_data["user_id"] = user_id
+    if user_data.get("username") != username:
+        user_data["username"] = username
+
+async def _require_subscription(update: Update) -> bool:
+    """
+    Vérifie l'abonnement de l'utilisateur (cache local, cache partagé puis API).
+    Envoie le message "abonnement requis" et retourne False s'il n'est pas abonné.
+    """
+    if await check_user_subscription(update.effective_user.id):
+        return True
+    
+    await send_subscription_required(update.effective_message)
+    return False
+
 # Fonctions de base
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Envoie un message quand la commande /start est envoyée. Version optimisée."""
     user = update.effective_user
     user_id = user.id
     username = user.username
-    context.user_data["username"] = username
-    context.user_data["user_id"] = user_id
-    
-    # Répondre IMMÉDIATEMENT avec un message simple pour confirmer que le bot fonctionne
-    welcome_message = await send_message_queued(
-        chat_id=update.message.chat_id,
-        text=f"👋 *Bienvenue {username} sur FIFA 4x4 Predictor!*\n\n"
-             "Je suis en train d'activer votre compte...",
-        parse_mode='Markdown',
-        user_id=user_id,
-        high_priority=True
-    )
+    _remember_user(context.user_data, user_id, username)
     
     # Vérifier si l'utilisateur vient d'un lien de parrainage
     referrer_id = None
@@ -100,41 +379,40 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     # Enregistrer l'utilisateur en arrière-plan sans attendre le résultat
     asyncio.create_task(register_user(user_id, username, referrer_id))
     
-    # Message de bienvenue complet avec boutons
-    welcome_text = f"✅ *Compte activé!*\n\n"
-    welcome_text += "🏆 Bienvenue sur *FIFA 4x4 Predictor*!\n\n"
-    welcome_text += "⚠️ Pour utiliser toutes les fonctionnalités, vous devez être abonné "
-    welcome_text += f"à notre canal [AL VE CAPITAL](https://t.me/alvecapitalofficiel)."
-    
-    # Vérifier si l'utilisateur a déjà complété son quota de parrainages (via le cache)
-    has_completed = False
-    try:
-        # Vérifier si c'est un admin
-        if is_admin(user_id, username):
-            has_completed = True
-        else:
+    async def referrals_completed() -> bool:
+        """Vérifie si l'utilisateur a déjà complété son quota de parrainages (via le cache)."""
+        try:
+            # Vérifier si c'est un admin
+            if is_admin(user_id, username):
+                return True
             # Utiliser le cache si disponible
             cached_count = await get_cached_referral_count(user_id)
-            if cached_count is not None:
-                has_completed = cached_count >= MAX_REFERRALS
-    except Exception as e:
-        logger.error(f"Erreur lors de la vérification rapide du parrainage: {e}")
-    
-    # Créer les boutons
-    buttons = [
-        [InlineKeyboardButton("🔍 Vérifier mon abonnement", callback_data="verify_subscription")]
-    ]
+            return cached_count is not None and cached_count >= MAX_REFERRALS
+        except Exception as e:
+            logger.error(f"Erreur lors de la vérification rapide du parrainage: {e}")
+            return False
     
-    # Ajouter un bouton pour obtenir le lien de parrainage si nécessaire
-    if not has_completed:
-        buttons.append([InlineKeyboardButton("🔗 Obtenir mon lien de parrainage", callback_data="get_referral_link")])
+    # Répondre IMMÉDIATEMENT avec un message simple pour confirmer que le bot fonctionne,
+    # pendant que le cache de parrainage est consulté (les deux allers-retours se chevauchent)
+    welcome_message, has_completed = await asyncio.gather(
+        send_message_queued(
+            chat_id=update.message.chat_id,
+            text=f"👋 *Bienvenue {username} sur FIFA 4x4 Predictor!*\n\n"
+                 "Je suis en train d'activer votre compte...",
+            parse_mode='Markdown',
+            user_id=user_id,
+            high_priority=True
+        ),
+        referrals_completed()
+    )
     
-    reply_markup = InlineKeyboardMarkup(buttons)
+    # Bouton du lien de parrainage seulement si le quota n'est pas atteint
+    reply_markup = _WELCOME_VERIFY_MARKUP if has_completed else _WELCOME_VERIFY_REFERRAL_MARKUP
     
     # Mettre à jour le message précédent avec les informations complètes
     await edit_message_queued(
         message=welcome_message,
-        text=welcome_text,
+        text=_MSG_WELCOME,
         parse_mode='Markdown',
         reply_markup=reply_markup,
         disable_web_page_preview=True,
@@ -147,41 +425,21 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     # Récupérer les infos utilisateur
     user_id = update.effective_user.id
     username = update.effective_user.username
-    context.user_data["user_id"] = user_id
-    context.user_data["username"] = username
+    _remember_user(context.user_data, user_id, username)
     
     # Vérifier si c'est un admin
     if is_admin(user_id, username):
-        help_text = "*🔮 FIFA 4x4 Predictor - Aide (Admin)*\n\n"
-        help_text += "*Commandes disponibles:*\n"
-        help_text += "• `/start` - Démarrer le bot\n"
-        help_text += "• `/help` - Afficher ce message d'aide\n"
-        help_text += "• `/predict` - Commencer une prédiction\n"
-        help_text += "• `/teams` - Voir toutes les équipes disponibles\n"
-        help_text += "• `/check` - Vérifier l'état du système\n"
-        help_text += "• `/games` - Menu des jeux disponibles\n"
-        help_text += "• `/admin` - Commandes administrateur\n"
-        
         await send_message_queued(
             chat_id=update.message.chat_id,
-            text=help_text,
+            text=_MSG_HELP_ADMIN,
             parse_mode='Markdown',
             user_id=user_id,
             high_priority=True
         )
         return
     
-    # Vérifier l'abonnement via le cache
-    cached_status = await get_cached_subscription_status(user_id)
-    if cached_status is not None:
-        is_subscribed = cached_status
-    else:
-        # Si pas en cache, vérifier et mettre en cache
-        is_subscribed = await check_user_subscription(user_id)
-        await cache_subscription_status(user_id, is_subscribed)
-    
-    if not is_subscribed:
-        await send_subscription_required(update.message)
+    # Vérifier l'abonnement
+    if not await _require_subscription(update):
         return
     
     # Vérifier aussi le parrainage via le cache
@@ -198,21 +456,9 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         await send_referral_required(update.message)
         return
     
-    help_text = "*🔮 FIFA 4x4 Predictor - Aide*\n\n"
-    help_text += "*Commandes disponibles:*\n"
-    help_text += "• `/start` - Démarrer le bot\n"
-    help_text += "• `/help` - Afficher ce message d'aide\n"
-    help_text += "• `/predict` - Commencer une prédiction\n"
-    help_text += "• `/teams` - Voir toutes les équipes disponibles\n"
-    help_text += "• `/check` - Vérifier votre abonnement\n"
-    help_text += "• `/referral` - Gérer vos parrainages\n"
-    help_text += "• `/games` - Menu des jeux disponibles\n\n"
-    help_text += "*Note:* Les cotes sont obligatoires pour obtenir des prédictions précises.\n\n"
-    help_text += "Pour plus de détails, contactez l'administrateur du bot."
-    
     await send_message_queued(
         chat_id=update.message.chat_id,
-        text=help_text,
+        text=_MSG_HELP,
         parse_mode='Markdown',
         user_id=user_id,
         high_priority=True
@@ -226,7 +472,7 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         try:
             await send_message_queued(
                 chat_id=update.effective_message.chat_id,
-                text="Désolé, une erreur s'est produite. Veuillez réessayer ou contacter l'administrateur.",
+                text=_MSG_GENERIC_ERROR,
                 user_id=None,
                 high_priority=True
             )
@@ -238,8 +484,7 @@ async def check_subscription_command(update: Update, context: ContextTypes.DEFAU
     """Vérifie si l'utilisateur est abonné au canal @alvecapitalofficiel."""
     user_id = update.effective_user.id
     username = update.effective_user.username
-    context.user_data["user_id"] = user_id
-    context.user_data["username"] = username
+    _remember_user(context.user_data, user_id, username)
     
     # Si c'est un admin, afficher les infos système au lieu de la vérification d'abonnement
     if is_admin(user_id, username):
@@ -284,20 +529,10 @@ async def referral_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     """Gère les parrainages de l'utilisateur."""
     user_id = update.effective_user.id
     username = update.effective_user.username
-    context.user_data["user_id"] = user_id
-    context.user_data["username"] = username
-    
-    # Vérifier l'abonnement via le cache
-    cached_status = await get_cached_subscription_status(user_id)
-    if cached_status is not None:
-        is_subscribed = cached_status
-    else:
-        # Si pas en cache, vérifier et mettre en cache
-        is_subscribed = await check_user_subscription(user_id)
-        await cache_subscription_status(user_id, is_subscribed)
+    _remember_user(context.user_data, user_id, username)
     
-    if not is_subscribed:
-        await send_subscription_required(update.message)
+    # Vérifier l'abonnement
+    if not await _require_subscription(update):
         return
     
     # S'assurer que l'utilisateur est enregistré
@@ -349,15 +584,8 @@ async def referral_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             is_verified = "✅" if user.get('is_verified', False) else "⏳"
             message_text += f"• {is_verified} {user_username}\n"
     
-    # Créer les boutons
-    buttons = [
-        [InlineKeyboardButton("🔗 Copier le lien", callback_data="copy_referral_link")]
-    ]
-    
-    if not has_completed:
-        buttons.append([InlineKeyboardButton("✅ Vérifier mon parrainage", callback_data="verify_referral")])
-    
-    reply_markup = InlineKeyboardMarkup(buttons)
+    # Bouton de vérification seulement si le quota n'est pas atteint
+    reply_markup = _COPY_REFERRAL_LINK_MARKUP if has_completed else _REFERRAL_LINK_MARKUP
     
     await send_message_queued(
         chat_id=update.message.chat_id,
@@ -374,8 +602,7 @@ async def predict_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     """Lance le processus de prédiction quand la commande /predict est envoyée."""
     user_id = update.effective_user.id
     username = update.effective_user.username
-    context.user_data["user_id"] = user_id
-    context.user_data["username"] = username
+    _remember_user(context.user_data, user_id, username)
     
     # Vérification optimisée
     has_access = await verify_all_requirements(user_id, username, update.message, context)
@@ -405,15 +632,11 @@ async def predict_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         )
     
     # Lancer la sélection des équipes
-    keyboard = [
-        [InlineKeyboardButton("🏆 Sélectionner les équipes", callback_data="start_prediction")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = _START_PREDICTION_MARKUP
     
     await send_message_queued(
         chat_id=update.message.chat_id,
-        text="🔮 *Prêt pour une prédiction*\n\n"
-             "Cliquez sur le bouton ci-dessous pour commencer.",
+        text=_MSG_READY_FOR_PREDICTION,
         reply_markup=reply_markup,
         parse_mode='Markdown',
         user_id=user_id,
@@ -425,8 +648,7 @@ async def games_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     """Affiche le menu des jeux disponibles."""
     user_id = update.effective_user.id
     username = update.effective_user.username
-    context.user_data["user_id"] = user_id
-    context.user_data["username"] = username
+    _remember_user(context.user_data, user_id, username)
     
     # Vérification optimisée des exigences
     if not is_admin(user_id, username):
@@ -437,17 +659,243 @@ async def games_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     # Afficher le menu des jeux
     await show_games_menu(update.message, context)
 
+# Gestionnaires des callbacks à valeur fixe: (query, context, user_id, username)
+def _requires_access(handler):
+    """Vérifie les exigences d'accès (abonnement, parrainage) avant le gestionnaire, sauf pour les admins."""
+    @wraps(handler)
+    async def wrapper(query, context, user_id, username, *args):
+        if not is_admin(user_id, username):
+            # Le message du bouton cliqué est remplacé par "abonnement requis" (pas de nouvel envoi)
+            has_access = await verify_all_requirements(user_id, username, query.message, context, edit=True)
+            if not has_access:
+                return None
+        return await handler(query, context, user_id, username, *args)
+    return wrapper
+
+async def _cb_verify_subscription(query, context, user_id, username) -> None:
+    """Vérifie l'abonnement."""
+    await verify_subscription(query.message, user_id, username, context, edit=True)
+
+async def _cb_verify_referral(query, context, user_id, username) -> None:
+    """Vérifie le parrainage."""
+    await verify_referral(query.message, user_id, username, context, edit=True)
+
+async def _cb_get_referral_link(query, context, user_id, username) -> None:
+    """Génère et affiche le lien de parrainage."""
+    bot_info = await context.bot.get_me()
+    bot_username = bot_info.username
+    referral_link = await generate_referral_link(user_id, bot_username)
+    
+    # Obtenir le nombre actuel de parrainages
+    cached_count = await get_cached_referral_count(user_id)
+    if cached_count is not None:
+        referral_count = cached_count
+    else:
+        referral_count = await count_referrals(user_id)
+        await cache_referral_count(user_id, referral_count)
+    
+    # Message avec les instructions de parrainage
+    from referral_system import get_referral_instructions
+    message_text = f"🔗 *Votre lien de parrainage:*\n\n`{referral_link}`\n\n"
+    message_text += f"_Progression: {referral_count}/{MAX_REFERRALS} parrainage(s)_\n\n"
+    message_text += get_referral_instructions()
+    
+    await edit_message_queued(
+        message=query.message,
+        text=message_text,
+        parse_mode='Markdown',
+        reply_markup=_REFERRAL_LINK_MARKUP,
+        disable_web_page_preview=True,
+        user_id=user_id,
+        high_priority=True
+    )
+
+async def _cb_copy_referral_link(query, context, user_id, username) -> None:
+    """Telegram gère automatiquement la copie (déjà répondu avec query.answer())."""
+
+@_requires_access
+async def _cb_start_prediction(query, context, user_id, username) -> None:
+    """Lance la sélection des équipes."""
+    context.user_data["selecting_team1"] = True
+    await start_team_selection(query.message, context, edit=True)
+
+async def _cb_new_prediction(query, context, user_id, username) -> None:
+    """Propose une nouvelle prédiction."""
+    await edit_message_queued(
+        message=query.message,
+        text=_MSG_NEW_PREDICTION,
+        reply_markup=_START_PREDICTION_MARKUP,
+        parse_mode='Markdown',
+        user_id=user_id,
+        high_priority=True
+    )
+
+async def _cb_show_games(query, context, user_id, username) -> None:
+    """Affiche le menu des jeux."""
+    await show_games_menu(query.message, context)
+
+_CALLBACK_HANDLERS = {
+    "verify_subscription": _cb_verify_subscription,
+    "verify_referral": _cb_verify_referral,
+    "get_referral_link": _cb_get_referral_link,
+    "copy_referral_link": _cb_copy_referral_link,
+    "start_prediction": _cb_start_prediction,
+    "new_prediction": _cb_new_prediction,
+    "show_games": _cb_show_games,
+}
+
+# Gestionnaires des callbacks à préfixe: (query, context, user_id, username, arg)
+_CB_PREFIX_RE = re.compile(r"(teams_page|s1|s2|game)_(.+)")
+
+@_requires_access
+async def _cb_teams_page(query, context, user_id, username, arg) -> None:
+    """Navigation dans les pages d'équipes."""
+    try:
+        page = int(arg)
+    except ValueError:
+        logger.error(f"Erreur lors du traitement de la page d'équipes: {arg}")
+        return
+    
+    is_team1 = context.user_data.get("selecting_team1", True)
+    await show_teams_page(query.message, context, page, edit=True, is_team1=is_team1)
+
+async def _cb_select_team1(query, context, user_id, username, arg) -> None:
+    """Sélection de la première équipe."""
+    team1 = await _team_from_id(arg)
+    if team1 is None:
+        await edit_message_queued(
+            message=query.message,
+            text=_MSG_SELECTION_ERROR,
+            parse_mode='Markdown',
+            user_id=user_id,
+            high_priority=True
+        )
+        return
+    
+    context.user_data["team1"] = team1
+    context.user_data["selecting_team1"] = False
+    
+    # Animation simplifiée
+    await edit_message_queued(
+        message=query.message,
+        text=_TPL_TEAM1_SELECTED.format(team=team1),
+        parse_mode='Markdown',
+        user_id=user_id,
+        high_priority=True
+    )
+    
+    # Passer à la sélection de la deuxième équipe
+    await start_team2_selection(query.message, context, edit=True)
+
+async def _cb_select_team2(query, context, user_id, username, arg) -> None:
+    """Sélection de la deuxième équipe."""
+    team2 = await _team_from_id(arg)
+    team1 = context.user_data.get("team1", "")
+    
+    if not team1 or team2 is None:
+        await edit_message_queued(
+            message=query.message,
+            text=_MSG_SELECTION_ERROR,
+            parse_mode='Markdown',
+            user_id=user_id,
+            high_priority=True
+        )
+        return
+    
+    # Sauvegarder l'équipe 2
+    context.user_data["team2"] = team2
+    
+    # Animation simplifiée
+    await edit_message_queued(
+        message=query.message,
+        text=_TPL_TEAM2_SELECTED.format(team=team2),
+        parse_mode='Markdown',
+        user_id=user_id,
+        high_priority=True
+    )
+    
+    # Demander la première cote
+    await edit_message_queued(
+        message=query.message,
+        text=_TPL_ODDS_PROMPT_TEAM1.format(t1=team1, t2=team2),
+        parse_mode='Markdown',
+        user_id=user_id,
+        high_priority=True
+    )
+    
+    # Passer en mode conversation pour recevoir les cotes
+    context.user_data["flow"] = Flow.AWAIT_ODDS1
+    context.user_data["odds_for_match"] = f"{team1} vs {team2}"
+
+async def _cb_game(query, context, user_id, username, game_type) -> None:
+    """Affiche l'écran d'accueil d'un jeu."""
+    if game_type == "fifa":
+        # Vérifier l'accès
+        if not is_admin(user_id, username):
+            has_access = await verify_all_requirements(user_id, username, query.message, context)
+            if not has_access:
+                return
+        
+        # Afficher l'animation du jeu FIFA
+        await send_game_animation(
+            message=query.message,
+            game_type="fifa",
+            final_text="🏆 *FIFA 4x4 PREDICTOR*\n\n"
+                    "Pour obtenir une prédiction, sélectionnez les équipes qui s'affrontent.",
+            reply_markup=_FIFA_GAME_MARKUP,
+            edit=True,
+            user_id=user_id,
+            animation_duration=1.0
+        )
+    
+    elif game_type == "apple":
+        # Afficher animation pour Apple of Fortune
+        await send_game_animation(
+            message=query.message,
+            game_type="apple",
+            final_text="🍎 *APPLE OF FORTUNE*\n\n"
+                    "Découvrez la position de la pomme gagnante parmi 5 positions possibles!",
+            reply_markup=_APPLE_GAME_MARKUP,
+            edit=True,
+            user_id=user_id,
+            animation_duration=1.0
+        )
+    
+    elif game_type == "baccarat":
+        # Afficher animation pour Baccarat
+        await send_game_animation(
+            message=query.message,
+            game_type="baccarat",
+            final_text="🃏 *BACCARAT*\n\n"
+                    "Anticipez le gagnant entre le Joueur et le Banquier, ainsi que le nombre de points!",
+            reply_markup=_BACCARAT_GAME_MARKUP,
+            edit=True,
+            user_id=user_id,
+            animation_duration=1.0
+        )
+
+_PREFIX_CALLBACK_HANDLERS = {
+    "teams_page": _cb_teams_page,
+    "s1": _cb_select_team1,
+    "s2": _cb_select_team2,
+    "game": _cb_game,
+}
+
 # Gestionnaire des boutons de callback optimisé
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Gère les clics sur les boutons inline. Version optimisée avec file d'attente et cache."""
     query = update.callback_query
     user_id = query.from_user.id
     username = query.from_user.username
-    context.user_data["user_id"] = user_id
-    context.user_data["username"] = username
+    _remember_user(context.user_data, user_id, username)
     data = query.data
     
-    await query.answer()  # Répondre immédiatement au callback pour éviter le "chargement" sur l'interface
+    # Répondre au callback pour retirer le "chargement" sur l'interface.
+    # La vérification d'abonnement attend la réponse; ailleurs elle part en parallèle du traitement.
+    if data == "verify_subscription":
+        await query.answer()
+    else:
+        _fire_and_forget(query.answer())
     
     # Log pour debugging
     logger.info(f"Callback reçu: {data} de l'utilisateur {username} (ID: {user_id})")
@@ -466,275 +914,64 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         if estimated_wait > 10:
             await send_message_queued(
                 chat_id=query.message.chat_id,
-                text=f"⚠️ *Système actuellement très sollicité*\n\n"
-                     f"Temps d'attente estimé: *{estimated_wait:.1f} secondes*\n"
-                     f"Merci de votre patience!",
+                text=_TPL_SYSTEM_BUSY.format(wait=estimated_wait),
                 parse_mode='Markdown',
                 user_id=user_id,
-                high_priority=False
+                high_priority=False,
+                disable_notification=True
             )
     
     # Traiter les différents types de callbacks
-    if data == "verify_subscription":
-        # Vérifie l'abonnement
-        await verify_subscription(query.message, user_id, username, context, edit=True)
-    
-    elif data == "verify_referral":
-        # Vérifie le parrainage
-        await verify_referral(query.message, user_id, username, context, edit=True)
-    
-    elif data == "get_referral_link":
-        # Génère un lien de parrainage
-        bot_info = await context.bot.get_me()
-        bot_username = bot_info.username
-        referral_link = await generate_referral_link(user_id, bot_username)
-        
-        # Obtenir le nombre actuel de parrainages
-        cached_count = await get_cached_referral_count(user_id)
-        if cached_count is not None:
-            referral_count = cached_count
-        else:
-            referral_count = await count_referrals(user_id)
-            await cache_referral_count(user_id, referral_count)
-        
-        # Créer les boutons
-        keyboard = [
-            [InlineKeyboardButton("🔗 Copier le lien", callback_data="copy_referral_link")],
-            [InlineKeyboardButton("✅ Vérifier mon parrainage", callback_data="verify_referral")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        # Message avec les instructions de parrainage
-        from referral_system import get_referral_instructions
-        message_text = f"🔗 *Votre lien de parrainage:*\n\n`{referral_link}`\n\n"
-        message_text += f"_Progression: {referral_count}/{MAX_REFERRALS} parrainage(s)_\n\n"
-        message_text += get_referral_instructions()
-        
-        await edit_message_queued(
-            message=query.message,
-            text=message_text,
-            parse_mode='Markdown',
-            reply_markup=reply_markup,
-            disable_web_page_preview=True,
-            user_id=user_id,
-            high_priority=True
-        )
+    handler = _CALLBACK_HANDLERS.get(data)
+    # Callbacks à préfixe ("teams_page_<n>", "s1_<id>", "s2_<id>", "game_<jeu>"): un seul parsing
+    match = _CB_PREFIX_RE.fullmatch(data) if handler is None else None
     
-    elif data == "copy_referral_link":
-        # Telegram gère automatiquement la copie
-        pass  # Déjà répondu avec query.answer()
-    
-    elif data == "start_prediction":
-        # Vérification optimisée des exigences
-        if not is_admin(user_id, username):
-            has_access = await verify_all_requirements(user_id, username, query.message, context)
-            if not has_access:
-                return
-        
-        # Lancer la sélection des équipes
-        context.user_data["selecting_team1"] = True
-        await start_team_selection(query.message, context, edit=True)
+    if handler is not None:
+        await handler(query, context, user_id, username)
     
-    elif data.startswith("teams_page_"):
-        # Navigation dans les pages d'équipes
-        try:
-            page = int(data.split("_")[2])
-            is_team1 = context.user_data.get("selecting_team1", True)
-            
-            # Vérifier si c'est un admin
-            if not is_admin(user_id, username):
-                has_access = await verify_all_requirements(user_id, username, query.message, context)
-                if not has_access:
-                    return
-            
-            # Afficher la page d'équipes
-            await show_teams_page(query.message, context, page, edit=True, is_team1=is_team1)
-        except (ValueError, IndexError):
-            logger.error(f"Erreur lors du traitement de la page d'équipes: {data}")
+    elif match is not None:
+        prefix, arg = match.groups()
+        await _PREFIX_CALLBACK_HANDLERS[prefix](query, context, user_id, username, arg)
     
-    elif data.startswith("select_team1_"):
-        # Sélection de la première équipe
-        team1 = data[len("select_team1_"):]
-        context.user_data["team1"] = team1
-        context.user_data["selecting_team1"] = False
+    elif data.startswith("apple_") or data.startswith("baccarat_"):
+        # Traiter les jeux aléatoires (ces jeux seront implémentés dans leurs fichiers respectifs)
+        # Pour Apple of Fortune
+        if data == "apple_predict":
+            from games.apple_game import handle_apple_callback
+            await handle_apple_callback(update, context)
         
-        # Animation simplifiée
+        # Pour Baccarat
+        elif data.startswith("baccarat_"):
+            from games.baccarat_game import handle_baccarat_callback
+            await handle_baccarat_callback(update, context)
+    
+    else:
+        # Callback non reconnu
+        logger.warning(f"Callback non reconnu: {data}")
         await edit_message_queued(
             message=query.message,
-            text=f"✅ *{team1}* sélectionné!\n\nChargement des options pour l'équipe adverse...",
-            parse_mode='Markdown',
+            text="Action non reconnue. Veuillez réessayer ou utiliser le menu principal.",
             user_id=user_id,
             high_priority=True
         )
+
+# Fonction pour démarrer la sélection des équipes (première équipe)
+async def start_team_selection(message, context, edit=False, page=0) -> None:
+    """Affiche la première page de sélection d'équipe."""
+    try:
+        context.user_data["selecting_team1"] = True
+        await show_teams_page(message, context, page, edit, is_team1=True)
+    except Exception as e:
+        logger.error(f"Erreur lors du démarrage de la sélection d'équipes: {e}", exc_info=True)
         
-        # Passer à la sélection de la deuxième équipe
-        await start_team2_selection(query.message, context, edit=True)
-    
-    elif data.startswith("select_team2_"):
-        # Sélection de la deuxième équipe
-        team2 = data[len("select_team2_"):]
-        team1 = context.user_data.get("team1", "")
+        text = _MSG_GENERIC_ERROR
         
-        if not team1:
+        if edit and hasattr(message, 'edit_text'):
             await edit_message_queued(
-                message=query.message,
-                text="❌ *Erreur de sélection*\n\n"
-                    "Veuillez recommencer la procédure de sélection des équipes.",
+                message=message,
+                text=text,
                 parse_mode='Markdown',
-                user_id=user_id,
-                high_priority=True
-            )
-            return
-        
-        # Sauvegarder l'équipe 2
-        context.user_data["team2"] = team2
-        
-        # Animation simplifiée
-        await edit_message_queued(
-            message=query.message,
-            text=f"✅ *{team2}* sélectionné!\n\nPréparation de la saisie des cotes...",
-            parse_mode='Markdown',
-            user_id=user_id,
-            high_priority=True
-        )
-        
-        # Demander la première cote
-        await edit_message_queued(
-            message=query.message,
-            text=f"💰 *Saisie des cotes (obligatoire)*\n\n"
-                f"Match: *{team1}* vs *{team2}*\n\n"
-                f"Veuillez saisir la cote pour *{team1}*\n\n"
-                f"_Exemple: 1.85_",
-            parse_mode='Markdown',
-            user_id=user_id,
-            high_priority=True
-        )
-        
-        # Passer en mode conversation pour recevoir les cotes
-        context.user_data["awaiting_odds_team1"] = True
-        context.user_data["odds_for_match"] = f"{team1} vs {team2}"
-    
-    elif data == "new_prediction":
-        # Nouvelle prédiction
-        keyboard = [
-            [InlineKeyboardButton("🏆 Sélectionner les équipes", callback_data="start_prediction")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await edit_message_queued(
-            message=query.message,
-            text="🔮 *Nouvelle prédiction*\n\n"
-                 "Cliquez sur le bouton ci-dessous pour commencer.",
-            reply_markup=reply_markup,
-            parse_mode='Markdown',
-            user_id=user_id,
-            high_priority=True
-        )
-    
-    elif data == "show_games":
-        # Afficher le menu des jeux
-        await show_games_menu(query.message, context)
-    
-    elif data.startswith("game_"):
-        # Traitement des jeux spécifiques
-        # Traitement des jeux spécifiques
-        game_type = data[len("game_"):]
-        
-        if game_type == "fifa":
-            # Vérifier l'accès
-            if not is_admin(user_id, username):
-                has_access = await verify_all_requirements(user_id, username, query.message, context)
-                if not has_access:
-                    return
-            
-            # Afficher l'animation du jeu FIFA
-            await send_game_animation(
-                message=query.message,
-                game_type="fifa",
-                final_text="🏆 *FIFA 4x4 PREDICTOR*\n\n"
-                        "Pour obtenir une prédiction, sélectionnez les équipes qui s'affrontent.",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("👉 Sélectionner les équipes", callback_data="start_prediction")],
-                    [InlineKeyboardButton("🎮 Retour au menu", callback_data="show_games")]
-                ]),
-                edit=True,
-                user_id=user_id,
-                animation_duration=1.0
-            )
-        
-        elif game_type == "apple":
-            # Afficher animation pour Apple of Fortune
-            await send_game_animation(
-                message=query.message,
-                game_type="apple",
-                final_text="🍎 *APPLE OF FORTUNE*\n\n"
-                        "Découvrez la position de la pomme gagnante parmi 5 positions possibles!",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🔮 Obtenir une prédiction", callback_data="apple_predict")],
-                    [InlineKeyboardButton("🎮 Retour au menu", callback_data="show_games")]
-                ]),
-                edit=True,
-                user_id=user_id,
-                animation_duration=1.0
-            )
-        
-        elif game_type == "baccarat":
-            # Afficher animation pour Baccarat
-            await send_game_animation(
-                message=query.message,
-                game_type="baccarat",
-                final_text="🃏 *BACCARAT*\n\n"
-                        "Anticipez le gagnant entre le Joueur et le Banquier, ainsi que le nombre de points!",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🔢 Entrer le numéro de tour", callback_data="baccarat_enter_tour")],
-                    [InlineKeyboardButton("🎮 Retour au menu", callback_data="show_games")]
-                ]),
-                edit=True,
-                user_id=user_id,
-                animation_duration=1.0
-            )
-    
-    elif data.startswith("apple_") or data.startswith("baccarat_"):
-        # Traiter les jeux aléatoires (ces jeux seront implémentés dans leurs fichiers respectifs)
-        # Pour Apple of Fortune
-        if data == "apple_predict":
-            from games.apple_game import handle_apple_callback
-            await handle_apple_callback(update, context)
-        
-        # Pour Baccarat
-        elif data.startswith("baccarat_"):
-            from games.baccarat_game import handle_baccarat_callback
-            await handle_baccarat_callback(update, context)
-    
-    else:
-        # Callback non reconnu
-        logger.warning(f"Callback non reconnu: {data}")
-        await edit_message_queued(
-            message=query.message,
-            text="Action non reconnue. Veuillez réessayer ou utiliser le menu principal.",
-            user_id=user_id,
-            high_priority=True
-        )
-
-# Fonction pour démarrer la sélection des équipes (première équipe)
-async def start_team_selection(message, context, edit=False, page=0) -> None:
-    """Affiche la première page de sélection d'équipe."""
-    try:
-        context.user_data["selecting_team1"] = True
-        await show_teams_page(message, context, page, edit, is_team1=True)
-    except Exception as e:
-        logger.error(f"Erreur lors du démarrage de la sélection d'équipes: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
-        
-        text = "Désolé, une erreur s'est produite. Veuillez réessayer ou contacter l'administrateur."
-        
-        if edit and hasattr(message, 'edit_text'):
-            await edit_message_queued(
-                message=message,
-                text=text,
-                parse_mode='Markdown',
-                user_id=context.user_data.get("user_id"),
+                user_id=context.user_data.get("user_id"),
                 high_priority=True
             )
         else:
@@ -750,21 +987,13 @@ async def start_team_selection(message, context, edit=False, page=0) -> None:
 async def show_teams_page(message, context, page=0, edit=False, is_team1=True) -> None:
     """Affiche une page de la liste des équipes."""
     try:
-        # Essayer d'obtenir les équipes depuis le cache
-        teams = await get_cached_teams()
-        
-        if not teams:
-            # Si pas en cache, charger depuis la base de données
-            teams = get_all_teams()
-            
-            if teams:
-                # Mettre en cache pour la prochaine fois
-                await cache_teams(teams)
+        # Obtenir les équipes (cache puis base de données)
+        teams = await _load_teams()
         
         # Vérifier si des équipes ont été trouvées
         if not teams:
             logger.error("Aucune équipe trouvée dans la base de données")
-            error_message = "Aucune équipe disponible. Veuillez contacter l'administrateur."
+            error_message = _MSG_NO_TEAMS_AVAILABLE
             
             if edit and hasattr(message, 'edit_text'):
                 await edit_message_queued(
@@ -795,17 +1024,12 @@ async def show_teams_page(message, context, page=0, edit=False, is_team1=True) -
         end_idx = min(start_idx + TEAMS_PER_PAGE, len(teams))
         page_teams = teams[start_idx:end_idx]
         
-        # Créer les boutons pour les équipes
-        team_buttons = []
-        row = []
-        
-        callback_prefix = "select_team1_" if is_team1 else "select_team2_"
-        
-        for i, team in enumerate(page_teams):
-            row.append(InlineKeyboardButton(team, callback_data=f"{callback_prefix}{team}"))
-            if len(row) == 2 or i == len(page_teams) - 1:
-                team_buttons.append(row)
-                row = []
+        # Créer les boutons pour les équipes (2 par ligne)
+        callback_prefix = "s1_" if is_team1 else "s2_"
+        team_buttons = [
+            [InlineKeyboardButton(team, callback_data=f"{callback_prefix}{_TEAM2ID[team]}") for team in page_teams[i:i + 2]]
+            for i in range(0, len(page_teams), 2)
+        ]
         
         # Ajouter les boutons de navigation
         nav_buttons = []
@@ -829,10 +1053,7 @@ async def show_teams_page(message, context, page=0, edit=False, is_team1=True) -
         
         # Texte du message
         team_type = "première" if is_team1 else "deuxième"
-        text = (
-            f"🏆 *Sélection des équipes* (Page {page+1}/{total_pages})\n\n"
-            f"Veuillez sélectionner la *{team_type} équipe* pour votre prédiction:"
-        )
+        text = _TPL_TEAMS_PAGE.format(page=page + 1, total=total_pages, team_type=team_type)
         
         if edit and hasattr(message, 'edit_text'):
             await edit_message_queued(
@@ -854,11 +1075,9 @@ async def show_teams_page(message, context, page=0, edit=False, is_team1=True) -
             )
         
     except Exception as e:
-        logger.error(f"Erreur lors de l'affichage des équipes: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.error(f"Erreur lors de l'affichage des équipes: {e}", exc_info=True)
         
-        text = "Désolé, une erreur s'est produite. Veuillez réessayer ou contacter l'administrateur."
+        text = _MSG_GENERIC_ERROR
         
         if edit and hasattr(message, 'edit_text'):
             await edit_message_queued(
@@ -883,7 +1102,7 @@ async def start_team2_selection(message, context, edit=False, page=0) -> None:
     team1 = context.user_data.get("team1", "")
     
     if not team1:
-        text = "❌ *Erreur*\n\nVeuillez d'abord sélectionner la première équipe."
+        text = _MSG_TEAM1_REQUIRED
         
         if edit and hasattr(message, 'edit_text'):
             await edit_message_queued(
@@ -909,448 +1128,620 @@ async def start_team2_selection(message, context, edit=False, page=0) -> None:
 # Gestionnaire pour la saisie de la cote de l'équipe 1
 async def handle_odds_team1_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Gère la saisie de la cote pour la première équipe."""
-    if not context.user_data.get("awaiting_odds_team1", False):
+    message = update.effective_message
+    user = update.effective_user
+    ud = context.user_data
+    if ud.get("flow") != Flow.AWAIT_ODDS1:
         return ConversationHandler.END
     
-    # Vérification optimisée des exigences
-    user_id = update.effective_user.id
-    username = update.effective_user.username
-    
-    if not is_admin(user_id, username):
-        has_access = await verify_all_requirements(user_id, username, update.message, context)
-        if not has_access:
-            return ConversationHandler.END
-    
-    user_input = update.message.text.strip()
-    team1 = context.user_data.get("team1", "")
-    team2 = context.user_data.get("team2", "")
+    user_id = user.id
+    username = user.username
+    team1 = ud.get("team1", "")
+    team2 = ud.get("team2", "")
     
-    # Extraire la cote
-    try:
-        odds1 = float(user_input.replace(",", "."))
-        
-        # Vérifier que la cote est valide
-        if odds1 < 1.01:
-            await send_message_queued(
-                chat_id=update.message.chat_id,
-                text="❌ *Valeur de cote invalide*\n\n"
-                    "La cote doit être supérieure à 1.01.",
-                parse_mode='Markdown',
-                user_id=user_id,
-                high_priority=True
-            )
-            return ODDS_INPUT_TEAM1
-        
-        # Sauvegarder la cote
-        context.user_data["odds1"] = odds1
-        context.user_data["awaiting_odds_team1"] = False
-        
-        # Animation de validation de la cote
-        loading_message = await send_message_queued(
-            chat_id=update.message.chat_id,
-            text=f"✅ Cote de *{team1}* enregistrée: *{odds1}*",
-            parse_mode='Markdown',
-            user_id=user_id,
-            high_priority=True
-        )
-        
-        # Demander la cote de l'équipe 2
-        await asyncio.sleep(0.3)  # Délai réduit
-        
-        await edit_message_queued(
-            message=loading_message,
-            text=f"💰 *Saisie des cotes (obligatoire)*\n\n"
-                f"Match: *{team1}* vs *{team2}*\n\n"
-                f"Veuillez maintenant saisir la cote pour *{team2}*\n\n"
-                f"_Exemple: 2.35_",
+    # Analyse de la cote avant tout appel réseau (rejet rapide)
+    odds1 = _parse_odds(message.text)
+    if odds1 is None:
+        await send_message_queued(
+            chat_id=message.chat_id,
+            text=_TPL_ODDS_FORMAT_ERROR.format(team=team1, example="1.85"),
             parse_mode='Markdown',
             user_id=user_id,
             high_priority=True
         )
-        
-        # Passer à l'attente de la cote de l'équipe 2
-        context.user_data["awaiting_odds_team2"] = True
-        
-        return ODDS_INPUT_TEAM2
-    except ValueError:
+        return ODDS_INPUT_TEAM1
+    
+    # Vérifier que la cote est valide
+    if odds1 < 1.01:
         await send_message_queued(
-            chat_id=update.message.chat_id,
-            text="❌ *Format incorrect*\n\n"
-                f"Veuillez saisir uniquement la valeur numérique de la cote pour *{team1}*.\n\n"
-                "Exemple: `1.85`",
+            chat_id=message.chat_id,
+            text=_MSG_INVALID_ODDS,
             parse_mode='Markdown',
             user_id=user_id,
             high_priority=True
         )
         return ODDS_INPUT_TEAM1
+    
+    # Vérification optimisée des exigences
+    if not is_admin(user_id, username):
+        has_access = await verify_all_requirements(user_id, username, message, context)
+        if not has_access:
+            return ConversationHandler.END
+    
+    # Sauvegarder la cote
+    ud["odds1"] = odds1
+    ud["flow"] = Flow.IDLE
+    
+    # Animation de validation de la cote
+    loading_message = await send_message_queued(
+        chat_id=message.chat_id,
+        text=_TPL_ODDS_SAVED.format(team=team1, odds=odds1),
+        parse_mode='Markdown',
+        user_id=user_id,
+        high_priority=True
+    )
+    
+    # Demander la cote de l'équipe 2
+    await asyncio.sleep(0.3)  # Délai réduit
+    
+    await edit_message_queued(
+        message=loading_message,
+        text=_TPL_ODDS_PROMPT_TEAM2.format(t1=team1, t2=team2),
+        parse_mode='Markdown',
+        user_id=user_id,
+        high_priority=True
+    )
+    
+    # Passer à l'attente de la cote de l'équipe 2
+    ud["flow"] = Flow.AWAIT_ODDS2
+    
+    return ODDS_INPUT_TEAM2
 
 # Gestionnaire pour la saisie de la cote de l'équipe 2
 async def handle_odds_team2_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Gère la saisie de la cote pour la deuxième équipe."""
-    if not context.user_data.get("awaiting_odds_team2", False):
+    message = update.effective_message
+    user = update.effective_user
+    ud = context.user_data
+    if ud.get("flow") != Flow.AWAIT_ODDS2:
         return ConversationHandler.END
     
-    # Vérification optimisée des exigences
-    user_id = update.effective_user.id
-    username = update.effective_user.username
+    user_id = user.id
+    username = user.username
+    team1 = ud.get("team1", "")
+    team2 = ud.get("team2", "")
+    odds1 = ud.get("odds1", 0)
     
+    # Analyse de la cote avant tout appel réseau (rejet rapide)
+    odds2 = _parse_odds(message.text)
+    if odds2 is None:
+        await send_message_queued(
+            chat_id=message.chat_id,
+            text=_TPL_ODDS_FORMAT_ERROR.format(team=team2, example="2.35"),
+            parse_mode='Markdown',
+            user_id=user_id,
+            high_priority=True
+        )
+        return ODDS_INPUT_TEAM2
+    
+    # Vérifier que la cote est valide
+    if odds2 < 1.01:
+        await send_message_queued(
+            chat_id=message.chat_id,
+            text=_MSG_INVALID_ODDS,
+            parse_mode='Markdown',
+            user_id=user_id,
+            high_priority=True
+        )
+        return ODDS_INPUT_TEAM2
+    
+    # Vérification des exigences et lecture du cache de prédiction en parallèle
+    # (la lecture du cache n'a aucun effet de bord si l'accès est refusé)
     if not is_admin(user_id, username):
-        has_access = await verify_all_requirements(user_id, username, update.message, context)
+        has_access, cached_prediction = await asyncio.gather(
+            verify_all_requirements(user_id, username, message, context),
+            get_cached_prediction(team1, team2, odds1, odds2)
+        )
         if not has_access:
             return ConversationHandler.END
+    else:
+        cached_prediction = await get_cached_prediction(team1, team2, odds1, odds2)
     
-    user_input = update.message.text.strip()
-    team1 = context.user_data.get("team1", "")
-    team2 = context.user_data.get("team2", "")
-    odds1 = context.user_data.get("odds1", 0)
+    # Sauvegarder la cote
+    ud["odds2"] = odds2
+    ud["flow"] = Flow.IDLE
     
-    # Extraire la cote
-    try:
-        odds2 = float(user_input.replace(",", "."))
+    # Prédiction déjà en cache: l'afficher directement
+    if cached_prediction:
+        logger.info(f"Prédiction trouvée en cache pour {team1} vs {team2}")
         
-        # Vérifier que la cote est valide
-        if odds2 < 1.01:
-            await send_message_queued(
-                chat_id=update.message.chat_id,
-                text="❌ *Valeur de cote invalide*\n\n"
-                    "La cote doit être supérieure à 1.01.",
-                parse_mode='Markdown',
-                user_id=user_id,
-                high_priority=True
-            )
-            return ODDS_INPUT_TEAM2
+        # Formater la prédiction pour l'affichage
+        prediction_text = format_prediction_message(cached_prediction)
         
-        # Sauvegarder la cote
-        context.user_data["odds2"] = odds2
-        context.user_data["awaiting_odds_team2"] = False
+        # Afficher le résultat
+        reply_markup = _NEW_PREDICTION_MARKUP
         
-        # Vérifier d'abord le cache pour la prédiction
-        cached_prediction = await get_cached_prediction(team1, team2, odds1, odds2)
-        if cached_prediction:
-            logger.info(f"Prédiction trouvée en cache pour {team1} vs {team2}")
-            
-            # Formater la prédiction pour l'affichage
-            prediction_text = format_prediction_message(cached_prediction)
-            
-            # Afficher le résultat
-            keyboard = [
-                [InlineKeyboardButton("🔄 Nouvelle prédiction", callback_data="new_prediction")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            # Afficher une animation avant le résultat
-            await send_prediction_animation(
-                message=update.message,
-                final_text=prediction_text,
+        # Afficher une animation avant le résultat
+        await send_prediction_animation(
+            message=message,
+            final_text=prediction_text,
+            reply_markup=reply_markup,
+            user_id=user_id,
+            game_type="fifa",
+            loading_duration=1.0
+        )
+        
+        # Enregistrer la prédiction dans les logs (écriture par lots en arrière-plan)
+        queue_prediction_log(
+            user_id=user_id,
+            username=username,
+            team1=team1,
+            team2=team2,
+            odds1=odds1,
+            odds2=odds2,
+            prediction_result=cached_prediction
+        )
+        
+        return ConversationHandler.END
+    
+    # Si pas en cache, lancer la prédiction
+    prediction_task = asyncio.create_task(get_match_predictor().predict_match(team1, team2, odds1, odds2))
+    loading_message = None
+    
+    async def show_result(text, reply_markup):
+        """Affiche le résultat: édition du message d'attente s'il existe, sinon envoi direct."""
+        if loading_message is None:
+            return await send_message_queued(
+                chat_id=message.chat_id,
+                text=text,
                 reply_markup=reply_markup,
+                parse_mode='Markdown',
                 user_id=user_id,
-                game_type="fifa",
-                loading_duration=1.0
+                high_priority=True
             )
-            
-            # Enregistrer la prédiction dans les logs (en arrière-plan)
-            asyncio.create_task(save_prediction_log(
-                user_id=user_id,
-                username=username,
-                team1=team1,
-                team2=team2,
-                odds1=odds1,
-                odds2=odds2,
-                prediction_result=cached_prediction
-            ))
-            
-            return ConversationHandler.END
-        
-        # Si pas en cache, générer la prédiction avec animation
-        loading_message = await send_message_queued(
-            chat_id=update.message.chat_id,
-            text=f"🧠 *Analyse des données en cours...*",
+        return await edit_message_queued(
+            message=loading_message,
+            text=text,
+            reply_markup=reply_markup,
             parse_mode='Markdown',
             user_id=user_id,
             high_priority=True
         )
-        
-        # Générer la prédiction
+    
+    # Récupérer la prédiction
+    try:
         try:
-            # Génération de la prédiction
-            prediction = await predictor.predict_match(team1, team2, odds1, odds2)
-            
-            if not prediction or "error" in prediction:
-                error_msg = prediction.get("error", "Erreur inconnue") if prediction else "Impossible de générer une prédiction"
-                
-                # Proposer de réessayer
-                keyboard = [
-                    [InlineKeyboardButton("🔄 Nouvelle prédiction", callback_data="new_prediction")]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                
-                await edit_message_queued(
-                    message=loading_message,
-                    text=f"❌ *Erreur de prédiction*\n\n"
-                        f"{error_msg}\n\n"
-                        f"Veuillez essayer avec d'autres équipes.",
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown',
-                    user_id=user_id,
-                    high_priority=True
-                )
-                return ConversationHandler.END
-            
-            # Formater et envoyer la prédiction
-            prediction_text = format_prediction_message(prediction)
-            
-            # Proposer une nouvelle prédiction
-            keyboard = [
-                [InlineKeyboardButton("🔄 Nouvelle prédiction", callback_data="new_prediction")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await edit_message_queued(
-                message=loading_message,
-                text=prediction_text,
-                reply_markup=reply_markup,
+            # Prédiction rapide: réponse directe, sans message d'attente à éditer ensuite
+            prediction = await asyncio.wait_for(asyncio.shield(prediction_task), timeout=FAST_PREDICTION_DELAY)
+        except asyncio.TimeoutError:
+            loading_message = await send_message_queued(
+                chat_id=message.chat_id,
+                text=_MSG_ANALYSIS_IN_PROGRESS,
                 parse_mode='Markdown',
                 user_id=user_id,
                 high_priority=True
             )
+            prediction = await prediction_task
+        
+        if not prediction or "error" in prediction:
+            error_msg = prediction.get("error", "Erreur inconnue") if prediction else "Impossible de générer une prédiction"
             
-            # Mettre en cache la prédiction pour les prochaines demandes
-            await cache_prediction(team1, team2, odds1, odds2, prediction)
-            
-            # Enregistrer la prédiction dans les logs (en arrière-plan)
-            asyncio.create_task(save_prediction_log(
-                user_id=user_id,
-                username=username,
-                team1=team1,
-                team2=team2,
-                odds1=odds1,
-                odds2=odds2,
-                prediction_result=prediction
-            ))
-            
-            return ConversationHandler.END
-        except Exception as e:
-            logger.error(f"Erreur lors de la génération de la prédiction: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            
-            # Proposer de réessayer en cas d'erreur
-            keyboard = [
-                [InlineKeyboardButton("🔄 Nouvelle prédiction", callback_data="new_prediction")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            # Proposer de réessayer
+            reply_markup = _NEW_PREDICTION_MARKUP
             
-            await edit_message_queued(
-                message=loading_message,
-                text="❌ *Une erreur s'est produite lors de la génération de la prédiction*\n\n"
-                    "Veuillez réessayer avec d'autres équipes ou contacter l'administrateur.",
-                reply_markup=reply_markup,
-                parse_mode='Markdown',
-                user_id=user_id,
-                high_priority=True
-            )
+            await show_result(_TPL_PREDICTION_ERROR.format(error=error_msg), reply_markup)
             return ConversationHandler.END
-    except ValueError:
-        await send_message_queued(
-            chat_id=update.message.chat_id,
-            text="❌ *Format incorrect*\n\n"
-                f"Veuillez saisir uniquement la valeur numérique de la cote pour *{team2}*.\n\n"
-                "Exemple: `2.35`",
-            parse_mode='Markdown',
+        
+        # Formater et envoyer la prédiction
+        prediction_text = format_prediction_message(prediction)
+        
+        # Proposer une nouvelle prédiction
+        reply_markup = _NEW_PREDICTION_MARKUP
+        
+        # Afficher le résultat et mettre en cache la prédiction en parallèle
+        await asyncio.gather(
+            show_result(prediction_text, reply_markup),
+            cache_prediction(team1, team2, odds1, odds2, prediction)
+        )
+        
+        # Enregistrer la prédiction dans les logs (écriture par lots en arrière-plan)
+        queue_prediction_log(
             user_id=user_id,
-            high_priority=True
+            username=username,
+            team1=team1,
+            team2=team2,
+            odds1=odds1,
+            odds2=odds2,
+            prediction_result=prediction
         )
-        return ODDS_INPUT_TEAM2
-        # Fonction pour lister les équipes disponibles
+        
+        return ConversationHandler.END
+    except Exception as e:
+        logger.error(f"Erreur lors de la génération de la prédiction: {e}", exc_info=True)
+        
+        # Proposer de réessayer en cas d'erreur
+        reply_markup = _NEW_PREDICTION_MARKUP
+        
+        await show_result(_MSG_PREDICTION_FAILED, reply_markup)
+        return ConversationHandler.END
+
+# Taille maximale (octets UTF-8) d'un message de la liste des équipes (limite Telegram: 4096 caractères,
+# toujours respectée puisqu'un caractère compte au moins un octet)
+TEAMS_MESSAGE_MAX_LENGTH = 4000
+
+@lru_cache(maxsize=1024)
+def _md(name: str) -> str:
+    """Échappe un nom d'équipe pour le Markdown (v1) utilisé par le bot, en dehors des entités."""
+    return escape_markdown(name, version=1)
+
+def _utf8_len(text: str) -> int:
+    """Taille de `text` en octets UTF-8."""
+    return len(text.encode("utf-8"))
+
+def _chunk_markdown(text: str, limit: int = TEAMS_MESSAGE_MAX_LENGTH):
+    """
+    Découpe paresseusement un texte en morceaux de `limit` octets UTF-8 au plus,
+    en coupant après le dernier saut de ligne ou la dernière virgule (jamais au milieu d'un nom).
+    """
+    start = 0
+    while _utf8_len(text[start:]) > limit:
+        end = start + limit
+        # Réduire la fenêtre tant que ses caractères multi-octets dépassent la limite
+        while _utf8_len(text[start:end]) > limit:
+            end = start + (end - start) * limit // _utf8_len(text[start:end])
+        cut = text.rfind("\n", start, end)
+        if cut <= start:
+            cut = text.rfind(", ", start, end - 1)
+            cut = cut + 2 if cut > start else end
+        else:
+            cut += 1
+        yield text[start:cut]
+        start = cut
+    if start < len(text):
+        yield text[start:]
+
+def _build_teams_chunks(teams: List[str]) -> List[str]:
+    """
+    Construit le texte de /teams (équipes groupées par initiale) et le découpe
+    en messages de TEAMS_MESSAGE_MAX_LENGTH octets au plus, entre deux groupes.
+    """
+    # Un seul tri: par initiale puis par nom sans tenir compte de la casse,
+    # ce qui donne directement des groupes ordonnés
+    sorted_teams = sorted(teams, key=lambda team: (team[0].upper(), team.lower()))
+    
+    parts = ["📋 *Équipes disponibles:*\n\n"]
+    for letter, group in groupby(sorted_teams, key=lambda team: team[0].upper()):
+        parts.append(f"*{letter}*: {', '.join(map(_md, group))}\n\n")
+    
+    # Regrouper les parties en messages sans couper le Markdown d'un groupe
+    # (un groupe trop long pour un seul message est lui-même coupé entre deux équipes)
+    chunks = []
+    current = []
+    current_length = 0
+    for part in (piece for group_text in parts for piece in _chunk_markdown(group_text)):
+        part_length = _utf8_len(part)
+        if current and current_length + part_length > TEAMS_MESSAGE_MAX_LENGTH:
+            chunks.append("".join(current))
+            current = []
+            current_length = 0
+        current.append(part)
+        current_length += part_length
+    if current:
+        chunks.append("".join(current))
+    
+    return chunks
+
+# Messages de /teams déjà construits, associés à la liste d'équipes qui les a produits
+_teams_chunks: List[str] = []
+_teams_chunks_source: Optional[List[str]] = None
+
+def _get_teams_chunks(teams: List[str]) -> List[str]:
+    """Retourne les messages de /teams, reconstruits seulement quand la liste d'équipes change."""
+    global _teams_chunks, _teams_chunks_source
+    
+    # Même liste (cas courant): aucune comparaison. Après un rafraîchissement de _load_teams(),
+    # la nouvelle liste est comparée au contenu précédent avant de reconstruire les messages.
+    if teams is not _teams_chunks_source:
+        if teams != _teams_chunks_source:
+            _teams_chunks = _build_teams_chunks(teams)
+        _teams_chunks_source = teams
+    
+    return _teams_chunks
+
+# Fonction pour lister les équipes disponibles
 async def teams_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Affiche la liste des équipes disponibles dans la base de données."""
+    message = update.effective_message
+    user = update.effective_user
     # Récupérer les infos utilisateur
-    user_id = update.effective_user.id
-    username = update.effective_user.username
-    context.user_data["user_id"] = user_id
-    context.user_data["username"] = username
+    user_id = user.id
+    username = user.username
+    _remember_user(context.user_data, user_id, username)
     
     # Vérification optimisée des exigences
     if not is_admin(user_id, username):
-        has_access = await verify_all_requirements(user_id, username, update.message, context)
+        has_access = await verify_all_requirements(user_id, username, message, context)
         if not has_access:
             return
     
-    # Récupérer la liste des équipes (depuis le cache si possible)
-    teams = await get_cached_teams()
-    if not teams:
-        teams = get_all_teams()
-        if teams:
-            await cache_teams(teams)
+    # Récupérer la liste des équipes (copie locale de 5 minutes, puis cache et base de données)
+    teams = await _load_teams()
     
     if not teams:
         await send_message_queued(
-            chat_id=update.message.chat_id,
+            chat_id=message.chat_id,
             text="Aucune équipe n'a été trouvée dans la base de données.",
             user_id=user_id,
             high_priority=True
         )
         return
     
-    # Formater la liste des équipes de manière plus concise pour économiser des messages
-    teams_text = "📋 *Équipes disponibles:*\n\n"
-    
-    # Grouper les équipes sans trop de formatage pour réduire la taille
-    teams_by_letter = {}
-    for team in teams:
-        first_letter = team[0].upper()
-        if first_letter not in teams_by_letter:
-            teams_by_letter[first_letter] = []
-        teams_by_letter[first_letter].append(team)
-    
-    # Ajouter chaque groupe d'équipes
-    for letter in sorted(teams_by_letter.keys()):
-        teams_text += f"*{letter}*: "
-        teams_text += ", ".join(sorted(teams_by_letter[letter]))
-        teams_text += "\n\n"
-    
-    # Si le message est trop long, diviser en plusieurs messages
-    if len(teams_text) > 4000:
-        chunks = [teams_text[i:i+4000] for i in range(0, len(teams_text), 4000)]
-        for chunk in chunks:
-            await send_message_queued(
-                chat_id=update.message.chat_id,
-                text=chunk,
-                parse_mode='Markdown',
-                user_id=user_id,
-                high_priority=True
-            )
-    else:
-        await send_message_queued(
-            chat_id=update.message.chat_id,
-            text=teams_text,
+    # Formater la liste des équipes, découpée en messages sans couper un groupe,
+    # puis envoyer tous les messages en parallèle
+    chat_id = message.chat_id
+    await asyncio.gather(*(
+        send_message_queued(
+            chat_id=chat_id,
+            text=chunk,
             parse_mode='Markdown',
             user_id=user_id,
             high_priority=True
         )
+        for chunk in _get_teams_chunks(teams)
+    ))
 
 # Gérer les messages directs
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[int]:
     """Répond aux messages qui ne sont pas des commandes."""
+    message = update.effective_message
+    user = update.effective_user
+    ud = context.user_data
     # Récupérer les infos utilisateur
-    user_id = update.effective_user.id
-    username = update.effective_user.username
-    context.user_data["user_id"] = user_id
-    context.user_data["username"] = username
+    user_id = user.id
+    username = user.username
+    _remember_user(ud, user_id, username)
     
     # Si l'utilisateur attend des cotes pour une équipe
-    if context.user_data.get("awaiting_odds_team1", False):
+    flow = ud.get("flow", Flow.IDLE)
+    if flow == Flow.AWAIT_ODDS1:
         return await handle_odds_team1_input(update, context)
     
-    if context.user_data.get("awaiting_odds_team2", False):
+    if flow == Flow.AWAIT_ODDS2:
         return await handle_odds_team2_input(update, context)
     
-    # Vérifier l'abonnement via le cache
-    if not is_admin(user_id, username):
-        cached_status = await get_cached_subscription_status(user_id)
-        if cached_status is not None:
-            is_subscribed = cached_status
-        else:
-            # Si pas en cache, vérifier et mettre en cache
-            is_subscribed = await check_user_subscription(user_id)
-            await cache_subscription_status(user_id, is_subscribed)
-        
-        if not is_subscribed:
-            await send_subscription_required(update.message)
-            return
-    
-    message_text = update.message.text.strip()
+    message_text = message.text.strip()
     
-    # Rechercher si le message ressemble à une demande de prédiction
-    if " vs " in message_text or " contre " in message_text:
-        # Vérifier le parrainage via le cache
-        if not is_admin(user_id, username):
-            cached_count = await get_cached_referral_count(user_id)
-            if cached_count is not None:
-                has_completed = cached_count >= MAX_REFERRALS
-            else:
-                # Si pas en cache, vérifier et mettre en cache
-                has_completed = await has_completed_referrals(user_id)
-                referral_count = await count_referrals(user_id)
-                await cache_referral_count(user_id, referral_count)
-            
-            if not has_completed:
-                await send_referral_required(update.message)
-                return
-        
-        # Informer l'utilisateur d'utiliser la méthode interactive
-        keyboard = [
-            [InlineKeyboardButton("🔮 Faire une prédiction", callback_data="start_prediction")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
+    # Chemin rapide: un message qui n'est pas une demande de match reçoit la réponse
+    # par défaut, sans vérification d'abonnement (aucun appel getChatMember)
+    if not is_match_request(message_text):
         await send_message_queued(
-            chat_id=update.message.chat_id,
-            text="ℹ️ *Nouvelle méthode de prédiction*\n\n"
-                "Pour une expérience améliorée, veuillez utiliser notre système interactif de prédiction.\n\n"
-                "Cliquez sur le bouton ci-dessous pour commencer une prédiction guidée avec sélection d'équipes et cotes obligatoires.",
-            reply_markup=reply_markup,
-            parse_mode='Markdown',
+            chat_id=message.chat_id,
+            text=_DEFAULT_REPLY,
             user_id=user_id,
             high_priority=True
         )
         return
     
-    # Message par défaut si aucune action n'est déclenchée
+    if not is_admin(user_id, username):
+        # Vérifier l'abonnement
+        if not await _require_subscription(update):
+            return
+        
+        # Vérifier le parrainage via le cache
+        cached_count = await get_cached_referral_count(user_id)
+        if cached_count is not None:
+            has_completed = cached_count >= MAX_REFERRALS
+        else:
+            # Si pas en cache, vérifier et mettre en cache
+            has_completed = await has_completed_referrals(user_id)
+            referral_count = await count_referrals(user_id)
+            await cache_referral_count(user_id, referral_count)
+        
+        if not has_completed:
+            await send_referral_required(message)
+            return
+    
+    # Informer l'utilisateur d'utiliser la méthode interactive
     await send_message_queued(
-        chat_id=update.message.chat_id,
-        text="Je ne comprends pas cette commande. Utilisez /help pour voir les commandes disponibles.",
+        chat_id=message.chat_id,
+        text=_MSG_INTERACTIVE_METHOD,
+        reply_markup=_INTERACTIVE_PREDICTION_MARKUP,
+        parse_mode='Markdown',
         user_id=user_id,
         high_priority=True
     )
 
+# Tâches de fond lancées une fois la boucle du bot démarrée
+async def post_init(application: Application) -> None:
+    """Démarre les tâches de fond de l'application."""
+    # Pool borné pour asyncio.to_thread / run_in_executor
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+    )
+    
+    # Envois hors gestionnaire (file d'attente, notifications de parrainage) via le client
+    # de l'application et son pool de connexions HTTP/2
+    set_shared_bot(application.bot)
+    
+    # Préchargement des données de prédiction pendant le démarrage du polling
+    # (la première prédiction attend ce chargement au lieu d'en lancer un autre)
+    application.create_task(preload_prediction_data())
+    
+    # Liste des équipes chargée avant la première sélection, puis tenue à jour en arrière-plan
+    # (tâche asyncio simple: Application.stop() attendrait sans fin une tâche de create_task)
+    application.bot_data["teams_refresh_task"] = asyncio.create_task(_refresh_teams_periodically())
+    
+    # Écriture par lots des logs de prédiction
+    application.bot_data["prediction_log_task"] = start_prediction_log_worker()
+    
+    # Invalidations d'abonnement partagées entre processus (Redis uniquement)
+    application.bot_data["subscription_invalidation_thread"] = start_subscription_invalidation_sync()
+
+# Arrêt propre: écrire les logs de prédiction encore en file
+async def post_shutdown(application: Application) -> None:
+    """Arrête les tâches de fond et écrit les données en attente."""
+    for task_key in ("teams_refresh_task", "prediction_log_task"):
+        task = application.bot_data.get(task_key)
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    
+    await flush_prediction_logs()
+    
+    invalidation_thread = application.bot_data.get("subscription_invalidation_thread")
+    if invalidation_thread is not None:
+        invalidation_thread.stop()
+
+# Identifiants des dernières mises à jour traitées (Telegram peut renvoyer une mise à jour)
+RECENT_UPDATES_MAX = 1024
+_recent_update_ids: "OrderedDict[int, None]" = OrderedDict()
+
+async def _drop_duplicate_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Arrête le traitement d'une mise à jour déjà reçue, avant tout autre gestionnaire."""
+    update_id = update.update_id
+    if update_id in _recent_update_ids:
+        logger.info(f"Mise à jour {update_id} reçue en double, ignorée")
+        raise ApplicationHandlerStop
+    
+    _recent_update_ids[update_id] = None
+    if len(_recent_update_ids) > RECENT_UPDATES_MAX:
+        _recent_update_ids.popitem(last=False)
+
+# Commandes du bot: nom -> (gestionnaire, bloquante)
+# Les commandes en lecture seule ne bloquent pas le traitement de la mise à jour
+COMMAND_TABLE: Dict[str, Tuple[Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[None]], bool]] = {
+    "start": (start, True),
+    "help": (help_command, False),
+    "predict": (predict_command, True),
+    "teams": (teams_command, False),
+    "check": (check_subscription_command, True),
+    "referral": (referral_command, True),
+    "games": (games_command, False),
+}
+
+async def _command_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Aiguille une commande vers son gestionnaire par une recherche dans COMMAND_TABLE."""
+    # "/Commande@NomDuBot arguments" -> "commande"
+    command = update.effective_message.text.split(maxsplit=1)[0][1:].partition("@")[0].lower()
+    entry = COMMAND_TABLE.get(command)
+    if entry is None:
+        return
+    
+    callback, block = entry
+    if block:
+        await callback(update, context)
+    else:
+        context.application.create_task(callback(update, context), update=update)
+
 # Fonction principale
 def main() -> None:
     """Démarre le bot."""
+    # Utiliser uvloop (boucle asyncio basée sur libuv) quand il est disponible
     try:
-        # Initialiser le système amélioré
-        ensure_initialization()
-        
-        # Créer l'application
-        application = Application.builder().token(TELEGRAM_TOKEN).build()
-
-        # Ajouter les gestionnaires de commandes
-        application.add_handler(CommandHandler("start", start))
-        application.add_handler(CommandHandler("help", help_command))
-        application.add_handler(CommandHandler("predict", predict_command))
-        application.add_handler(CommandHandler("teams", teams_command))
-        application.add_handler(CommandHandler("check", check_subscription_command))
-        application.add_handler(CommandHandler("referral", referral_command))
-        application.add_handler(CommandHandler("games", games_command))
-        
-        # Gestionnaire de conversation pour les cotes
-        conv_handler = ConversationHandler(
-            entry_points=[MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message)],
-            states={
-                ODDS_INPUT_TEAM1: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_odds_team1_input)],
-                ODDS_INPUT_TEAM2: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_odds_team2_input)]
-            },
-            fallbacks=[CommandHandler("cancel", lambda u, c: ConversationHandler.END)]
-        )
-        application.add_handler(conv_handler)
-        
-        # Ajouter le gestionnaire pour les clics sur les boutons
-        application.add_handler(CallbackQueryHandler(button_callback))
-        
-        # Ajouter le gestionnaire pour les messages normaux (après le ConversationHandler)
-        application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
-        
-        # Ajouter le gestionnaire d'erreurs
-        application.add_error_handler(error_handler)
+        import uvloop
+        uvloop.install()
+        logger.info("Boucle d'événements uvloop activée")
+    except ImportError:
+        logger.warning("uvloop non disponible, utilisation de la boucle asyncio standard")
+    
+    # Initialiser le système amélioré
+    ensure_initialization()
 
-        # Démarrer le bot
-        logger.info(f"Bot démarré avec le token: {TELEGRAM_TOKEN[:5]}...")
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
-        
-    except Exception as e:
-        logger.critical(f"ERREUR CRITIQUE lors du démarrage du bot: {e}")
-        import traceback
-        logger.critical(traceback.format_exc())
+    # Créer l'application (limiteur de débit intégré, mises à jour traitées en parallèle)
+    application = (
+        Application.builder()
+        .token(TELEGRAM_TOKEN)
+        # Connexions réutilisées entre les requêtes (poignée de main TLS amortie) et
+        # multiplexées en HTTP/2; getUpdates garde sa propre connexion
+        .request(HTTPXRequest(
+            connection_pool_size=BOT_CONNECTION_POOL_SIZE,
+            pool_timeout=1.0,
+            connect_timeout=5.0,
+            read_timeout=10.0,
+            http_version="2"
+        ))
+        .get_updates_request(HTTPXRequest(
+            connect_timeout=10.0,
+            pool_timeout=10.0,
+            read_timeout=GET_UPDATES_READ_TIMEOUT,
+            write_timeout=GET_UPDATES_READ_TIMEOUT,
+            http_version="2"
+        ))
+        .rate_limiter(AIORateLimiter(overall_max_rate=30, max_retries=3))
+        .concurrent_updates(CONCURRENT_UPDATES)
+        # Conversations en cours et user_data conservés après un redémarrage (écriture groupée
+        # toutes les BOT_PERSISTENCE_INTERVAL secondes). bot_data n'est pas persisté: il contient
+        # les tâches et le thread de fond démarrés par post_init
+        .persistence(PicklePersistence(
+            filepath=BOT_PERSISTENCE_FILE,
+            store_data=PersistenceInput(bot_data=False, chat_data=False, callback_data=False),
+            update_interval=BOT_PERSISTENCE_INTERVAL
+        ))
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+
+    # Filtre des doublons, dans un groupe exécuté avant tous les autres
+    application.add_handler(TypeHandler(Update, _drop_duplicate_update), group=-2)
+    
+    # Gestionnaires enregistrés du plus sélectif au plus large: PTB teste les gestionnaires
+    # d'un groupe dans l'ordre, un clic sur un bouton trouve donc le sien dès le premier test
+    application.add_handler(CallbackQueryHandler(button_callback))
+    
+    # Un seul gestionnaire pour toutes les commandes (aiguillage par dictionnaire)
+    application.add_handler(CommandHandler(list(COMMAND_TABLE), _command_router))
+    
+    # Gestionnaire de conversation pour les cotes; son point d'entrée reçoit aussi
+    # tous les messages texte normaux (un seul gestionnaire pour ces messages)
+    conv_handler = ConversationHandler(
+        entry_points=[MessageHandler(TEXT_NON_COMMAND, handle_message)],
+        states={
+            ODDS_INPUT_TEAM1: [MessageHandler(TEXT_NON_COMMAND, handle_odds_team1_input)],
+            ODDS_INPUT_TEAM2: [MessageHandler(TEXT_NON_COMMAND, handle_odds_team2_input)]
+        },
+        fallbacks=[CommandHandler("cancel", cancel_command)],
+        name="odds_conv",
+        persistent=True
+    )
+    application.add_handler(conv_handler)
+    
+    # Ajouter le gestionnaire d'erreurs
+    application.add_error_handler(error_handler)
+
+    # Démarrer le bot
+    logger.info("Bot démarré avec le token: %s...", TOKEN_PREFIX)
+    # Seuls les messages et les clics sur les boutons sont traités; les mises à jour
+    # accumulées pendant l'arrêt du bot sont ignorées au démarrage.
+    allowed_updates = [Update.MESSAGE, Update.CALLBACK_QUERY]
+    
+    # Seule l'exécution est surveillée ici: une erreur de configuration plus haut interrompt
+    # le démarrage avec sa trace Python habituelle
+    try:
+        if WEBHOOK_URL:
+            # Webhook: Telegram pousse les mises à jour, aucun cycle getUpdates
+            logger.info("Réception des mises à jour par webhook sur le port %s", WEBHOOK_PORT)
+            application.run_webhook(
+                listen="0.0.0.0",
+                port=WEBHOOK_PORT,
+                url_path=urlparse(WEBHOOK_URL).path.lstrip("/"),
+                webhook_url=WEBHOOK_URL,
+                secret_token=WEBHOOK_SECRET,
+                allowed_updates=allowed_updates,
+                drop_pending_updates=True
+            )
+        else:
+            # Long polling: chaque getUpdates attend côté serveur au lieu de boucler à vide
+            application.run_polling(
+                allowed_updates=allowed_updates,
+                poll_interval=0.0,
+                timeout=POLLING_TIMEOUT,
+                bootstrap_retries=-1,
+                drop_pending_updates=True
+            )
+    except Exception:
+        logger.critical("ERREUR CRITIQUE pendant l'exécution du bot", exc_info=True)
+        raise
 
 if __name__ == '__main__':
     main()
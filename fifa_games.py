@@ -22,7 +22,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Importation des configurations
-from config import TELEGRAM_TOKEN, WELCOME_MESSAGE
+from config import TELEGRAM_TOKEN, WELCOME_MESSAGE, CONCURRENT_UPDATES, Flow
 
 # Imports pour la vérification admin
 from admin_access import is_admin
@@ -45,12 +45,15 @@ from database_adapter import get_all_teams, save_prediction_log
 # Import des modules de jeux spécifiques
 from games.apple_game import start_apple_game, handle_apple_callback
 from games.baccarat_game import start_baccarat_game, handle_baccarat_callback, handle_baccarat_tour_input
-from games.fifa_game import handle_fifa_callback
+from games.fifa_game import handle_fifa_callback, cancel_command, is_match_request
 
 # États de conversation pour les jeux
 BACCARAT_INPUT = 1
 ODDS_INPUT = 2
 
+# Filtre des messages texte hors commandes (composé une seule fois, partagé par les gestionnaires)
+TEXT_NON_COMMAND = filters.TEXT & ~filters.COMMAND
+
 # Variable pour suivre l'initialisation
 _is_system_initialized = False
 
@@ -169,9 +172,9 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         # Extraire le numéro de page
         try:
             if data.startswith("fifa_page_"):
-                page = int(data.split("_")[2])
+                page = int(data.removeprefix("fifa_page_"))
             else:
-                page = int(data.split("_")[2])
+                page = int(data.removeprefix("teams_page_"))
                 
             is_team1 = context.user_data.get("selecting_team1", True)
             
@@ -191,9 +194,7 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             await show_teams_page(query.message, context, page, edit=True, is_team1=is_team1)
             return
         except Exception as e:
-            logger.error(f"Erreur lors du traitement de la pagination: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.error(f"Erreur lors du traitement de la pagination: {e}", exc_info=True)
             await query.answer("Erreur lors du changement de page")
             return
     
@@ -274,12 +275,13 @@ async def handle_game_messages(update: Update, context: ContextTypes.DEFAULT_TYP
         return await handle_baccarat_tour_input(update, context)
     
     # Vérifier si c'est un message pour FIFA (cotes équipe 1)
-    if context.user_data.get("awaiting_odds_team1", False):
+    flow = context.user_data.get("flow", Flow.IDLE)
+    if flow == Flow.AWAIT_ODDS1:
         from games.fifa_game import handle_odds_team1_input
         return await handle_odds_team1_input(update, context)
     
     # Vérifier si c'est un message pour FIFA (cotes équipe 2)
-    if context.user_data.get("awaiting_odds_team2", False):
+    if flow == Flow.AWAIT_ODDS2:
         from games.fifa_game import handle_odds_team2_input
         return await handle_odds_team2_input(update, context)
     
@@ -287,7 +289,7 @@ async def handle_game_messages(update: Update, context: ContextTypes.DEFAULT_TYP
     message_text = update.message.text.strip()
     
     # Rechercher si le message ressemble à une demande de prédiction
-    if " vs " in message_text or " contre " in message_text:
+    if is_match_request(message_text):
         # Vérifier si l'utilisateur a accès (admin ou abonnement+parrainage)
         if not admin_status:
             has_access = await verify_all_requirements(user_id, username, update.message, context)
@@ -383,16 +385,17 @@ async def referral_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     # S'assurer que l'utilisateur est enregistré
     await register_user(user_id, username)
     
-    # Obtenir les statistiques de parrainage
-    referral_count = await count_referrals(user_id)
-    max_referrals = await get_max_referrals()
+    # Obtenir les statistiques de parrainage et les infos du bot (requêtes indépendantes, en parallèle)
+    referral_count, max_referrals, referred_users, bot_info = await asyncio.gather(
+        count_referrals(user_id),
+        get_max_referrals(),
+        get_referred_users(user_id),
+        context.bot.get_me()
+    )
     has_completed = referral_count >= max_referrals
-    referred_users = await get_referred_users(user_id)
     
     # Générer un lien de parrainage
-    bot_info = await context.bot.get_me()
-    bot_username = bot_info.username
-    referral_link = await generate_referral_link(user_id, bot_username)
+    referral_link = await generate_referral_link(user_id, bot_info.username)
     
     # Créer le message
     message_text = "👥 *Système de Parrainage FIFA 4x4 Predictor*\n\n"
@@ -461,6 +464,15 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         except Exception as e:
             logger.error(f"Erreur lors de l'envoi du message d'erreur: {e}")
 
+async def _referrals_completed(user_id) -> bool:
+    """Indique si l'utilisateur a déjà complété son quota de parrainages (False en cas d'erreur)."""
+    try:
+        referral_count, max_referrals = await asyncio.gather(count_referrals(user_id), get_max_referrals())
+        return referral_count >= max_referrals
+    except Exception as e:
+        logger.error(f"Erreur lors de la vérification du parrainage: {e}")
+        return False
+
 # Point d'entrée pour la commande /start
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Gère la commande /start."""
@@ -490,11 +502,15 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         )
         return
         
-    # Envoyer un message rapide pour confirmer la réception
-    message = await update.message.reply_text(
-        f"👋 *Bienvenue {username} sur FIFA 4x4 Predictor!*\n\n"
-        "Je suis en train d'activer votre compte...",
-        parse_mode='Markdown'
+    # Envoyer un message rapide pour confirmer la réception pendant la vérification du
+    # quota de parrainages (indépendants, en parallèle)
+    message, has_completed = await asyncio.gather(
+        update.message.reply_text(
+            f"👋 *Bienvenue {username} sur FIFA 4x4 Predictor!*\n\n"
+            "Je suis en train d'activer votre compte...",
+            parse_mode='Markdown'
+        ),
+        _referrals_completed(user_id)
     )
     
     # Vérifier si l'utilisateur vient d'un lien de parrainage
@@ -515,15 +531,6 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     welcome_text += "⚠️ Pour utiliser toutes les fonctionnalités, vous devez être abonné "
     welcome_text += f"à notre canal [AL VE CAPITAL](https://t.me/alvecapitalofficiel)."
     
-    # Vérifier si l'utilisateur a déjà complété son quota de parrainages
-    has_completed = False
-    try:
-        referral_count = await count_referrals(user_id)
-        max_referrals = await get_max_referrals()
-        has_completed = referral_count >= max_referrals
-    except Exception as e:
-        logger.error(f"Erreur lors de la vérification du parrainage: {e}")
-    
     # Créer les boutons
     buttons = [
         [InlineKeyboardButton("🔍 Vérifier mon abonnement", callback_data="verify_subscription")]
@@ -582,11 +589,15 @@ def main_webhook():
     bot_token = TELEGRAM_TOKEN
     webhook_url = os.environ.get('WEBHOOK_URL', 'https://fifa-predictor-bot.onrender.com/webhook')
     
-    # Créer l'application Telegram
+    # Créer l'application Telegram (mises à jour traitées en parallèle)
     global application, bot
-    application = Application.builder().token(bot_token).build()
+    application = Application.builder().token(bot_token).concurrent_updates(CONCURRENT_UPDATES).build()
     bot = application.bot
     
+    # Gestionnaire pour tous les callbacks, enregistré en premier: les clics sur les boutons
+    # n'ont pas à passer par les filtres des commandes et de la conversation
+    application.add_handler(CallbackQueryHandler(button_callback))
+    
     # Ajouter les gestionnaires de commandes
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", help_command))
@@ -594,23 +605,18 @@ def main_webhook():
     application.add_handler(CommandHandler("check", check_command))
     application.add_handler(CommandHandler("referral", referral_command))
     
-    # Gestionnaire de conversation pour les entrées spécifiques aux jeux
+    # Gestionnaire de conversation pour les entrées spécifiques aux jeux; son point d'entrée
+    # reçoit aussi tous les messages texte normaux (un seul gestionnaire pour ces messages)
     conv_handler = ConversationHandler(
-        entry_points=[MessageHandler(filters.TEXT & ~filters.COMMAND, handle_game_messages)],
+        entry_points=[MessageHandler(TEXT_NON_COMMAND, handle_game_messages)],
         states={
-            ODDS_INPUT: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_game_messages)],
-            BACCARAT_INPUT: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_game_messages)]
+            ODDS_INPUT: [MessageHandler(TEXT_NON_COMMAND, handle_game_messages)],
+            BACCARAT_INPUT: [MessageHandler(TEXT_NON_COMMAND, handle_game_messages)]
         },
-        fallbacks=[CommandHandler("cancel", lambda u, c: ConversationHandler.END)]
+        fallbacks=[CommandHandler("cancel", cancel_command)]
     )
     application.add_handler(conv_handler)
     
-    # Gestionnaire pour tous les callbacks
-    application.add_handler(CallbackQueryHandler(button_callback))
-    
-    # Ajouter le gestionnaire pour les messages normaux non gérés par la conversation
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_game_messages))
-    
     # Ajouter le gestionnaire d'erreurs
     application.add_error_handler(error_handler)
     
@@ -697,8 +703,12 @@ def main_polling():
     asyncio.set_event_loop(loop)
     loop.run_until_complete(initialize_system())
     
-    # Créer l'application
-    application = Application.builder().token(TELEGRAM_TOKEN).build()
+    # Créer l'application (mises à jour traitées en parallèle)
+    application = Application.builder().token(TELEGRAM_TOKEN).concurrent_updates(CONCURRENT_UPDATES).build()
+    
+    # Gestionnaire pour tous les callbacks, enregistré en premier: les clics sur les boutons
+    # n'ont pas à passer par les filtres des commandes et de la conversation
+    application.add_handler(CallbackQueryHandler(button_callback))
     
     # Ajouter les gestionnaires de commandes
     application.add_handler(CommandHandler("start", start))
@@ -707,23 +717,18 @@ def main_polling():
     application.add_handler(CommandHandler("check", check_command))
     application.add_handler(CommandHandler("referral", referral_command))
     
-    # Gestionnaire de conversation pour les entrées spécifiques aux jeux
+    # Gestionnaire de conversation pour les entrées spécifiques aux jeux; son point d'entrée
+    # reçoit aussi tous les messages texte normaux (un seul gestionnaire pour ces messages)
     conv_handler = ConversationHandler(
-        entry_points=[MessageHandler(filters.TEXT & ~filters.COMMAND, handle_game_messages)],
+        entry_points=[MessageHandler(TEXT_NON_COMMAND, handle_game_messages)],
         states={
-            ODDS_INPUT: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_game_messages)],
-            BACCARAT_INPUT: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_game_messages)]
+            ODDS_INPUT: [MessageHandler(TEXT_NON_COMMAND, handle_game_messages)],
+            BACCARAT_INPUT: [MessageHandler(TEXT_NON_COMMAND, handle_game_messages)]
         },
-        fallbacks=[CommandHandler("cancel", lambda u, c: ConversationHandler.END)]
+        fallbacks=[CommandHandler("cancel", cancel_command)]
     )
     application.add_handler(conv_handler)
     
-    # Gestionnaire pour tous les callbacks
-    application.add_handler(CallbackQueryHandler(button_callback))
-    
-    # Ajouter le gestionnaire pour les messages normaux non gérés par la conversation
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_game_messages))
-    
     # Ajouter le gestionnaire d'erreurs
     application.add_error_handler(error_handler)
     
@@ -735,12 +740,24 @@ def main_polling():
     except Exception as e:
         logger.warning(f"Erreur lors de la suppression du webhook: {e}")
     
-    # Démarrer le bot en mode polling
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    # Démarrer le bot en mode polling. Seuls les types de mises à jour gérés plus haut
+    # (messages texte/commandes et clics sur les boutons) sont demandés à Telegram:
+    # ajouter un gestionnaire d'un autre type impose de compléter cette liste
+    application.run_polling(allowed_updates=[Update.MESSAGE, Update.CALLBACK_QUERY])
 
 # Point d'entrée principal
 if __name__ == '__main__':
     print("Démarrage du bot FIFA 4x4 Predictor...")
+    
+    # Utiliser uvloop (boucle asyncio basée sur libuv) quand il est disponible, avant la
+    # création de toute boucle d'événements (main_polling / main_webhook)
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("Boucle d'événements uvloop activée")
+    except ImportError:
+        logger.warning("uvloop non disponible, utilisation de la boucle asyncio standard")
+    
     print("Détection du mode de fonctionnement...")
     
     # Déterminer le mode (webhook ou polling) en fonction de l'environnement
@@ -13,14 +13,14 @@ logger = logging.getLogger(__name__)
 # Importer les modules nécessaires
 from queue_manager import start_queue_manager, stop_queue_manager
 from cache_system import start_cache_monitoring
-from predictor import preload_prediction_data
 
 async def initialize_system():
     """
     Initialise tous les systèmes optimisés :
     1. Démarre le gestionnaire de file d'attente
-    2. Précharge les données de prédiction
-    3. Démarre la surveillance du cache
+    2. Démarre la surveillance du cache
+    Les données de prédiction sont préchargées en arrière-plan une fois le bot démarré
+    (voir post_init dans fifa_bot.py), sans retarder le démarrage.
     """
     logger.info("Initialisation du système optimisé...")
     
@@ -28,22 +28,10 @@ async def initialize_system():
     logger.info("Démarrage du gestionnaire de file d'attente...")
     await start_queue_manager()
     
-    # Précharger les données de prédiction
-    logger.info("Préchargement des données de prédiction...")
-    preload_task = asyncio.create_task(preload_prediction_data())
-    
     # Démarrer la surveillance du cache
     logger.info("Démarrage de la surveillance du cache...")
     cache_task = asyncio.create_task(start_cache_monitoring())
     
-    # Attendre la fin du préchargement des données
-    try:
-        await asyncio.wait_for(preload_task, timeout=30.0)
-        logger.info("Préchargement des données de prédiction terminé avec succès")
-    except asyncio.TimeoutError:
-        logger.warning("Le préchargement des données de prédiction prend plus de temps que prévu, "
-                      "l'application continuera à fonctionner mais avec des performances réduites initialement")
-    
     logger.info("Système optimisé initialisé avec succès")
 
 async def shutdown_system():
@@ -76,9 +64,7 @@ def ensure_initialization():
         logger.info("Initialisation du système réussie")
         return True
     except Exception as e:
-        logger.error(f"Erreur lors de l'initialisation du système: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.error(f"Erreur lors de l'initialisation du système: {e}", exc_info=True)
         return False
 
 # Si ce fichier est exécuté directement, initialiser le système
@@ -1,13 +1,18 @@
 import logging
 import asyncio
+import math
+import re
 import random
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, List, Dict, Any, Tuple, FrozenSet
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
 
 # Corriger les importations pour utiliser l'adaptateur de base de données
-from database_adapter import get_all_teams, save_prediction_log
-from predictor import MatchPredictor, format_prediction_message
+from database_adapter import get_all_teams_async, queue_prediction_log
+from predictor import get_match_predictor, format_prediction_message
+from config import Flow
+from queue_manager import ThrottledEditor
 
 # Configuration du logging
 logging.basicConfig(
@@ -16,9 +21,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialisation du prédicteur
-predictor = MatchPredictor()
-
 # États de conversation pour le jeu FIFA
 TEAM_SELECTION = 1
 ODDS_INPUT_TEAM1 = 2
@@ -27,6 +29,146 @@ ODDS_INPUT_TEAM2 = 3
 # Constantes pour la pagination des équipes
 TEAMS_PER_PAGE = 8
 
+# Réponses aux saisies de cotes invalides (construites une seule fois)
+_MSG_INVALID_ODDS = (
+    "❌ *Valeur de cote invalide*\n\n"
+    "La cote doit être supérieure à 1.01."
+)
+_TPL_ODDS_FORMAT_ERROR = (
+    "❌ *Format incorrect*\n\n"
+    "Veuillez saisir uniquement la valeur numérique de la cote pour *{team}*.\n\n"
+    "Exemple: `{example}`"
+)
+
+# Boutons proposés après une prédiction (construits une seule fois)
+_NEW_PREDICTION_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Nouvelle prédiction", callback_data="fifa_new_prediction")],
+    [InlineKeyboardButton("🎮 Accueil", callback_data="show_games")]
+])
+
+# Séparateur d'une demande de match ("Équipe A vs Équipe B"), partagé par fifa_bot.py et fifa_games.py
+_MATCH_REQUEST_RE = re.compile(r' (?:vs|contre) ')
+
+def is_match_request(text: str) -> bool:
+    """Indique si un message texte ressemble à une demande de match (" vs " ou " contre ")."""
+    return _MATCH_REQUEST_RE.search(text) is not None
+
+# Format accepté pour une cote: "1.85" ou "1,85"
+_ODDS_RE = re.compile(r'\d+(?:[.,]\d+)?')
+
+def _parse_odds(text: str) -> Optional[float]:
+    """Convertit la saisie d'une cote en float, ou None si le format est invalide (sans passer par une exception)."""
+    text = text.strip()
+    if not _ODDS_RE.fullmatch(text):
+        return None
+    odds = float(text.replace(",", "."))
+    # Un nombre de chiffres démesuré donne inf
+    return odds if math.isfinite(odds) else None
+
+# Identifiants courts des équipes pour les callback_data (limite Telegram: 64 octets)
+_ID2TEAM: List[str] = []
+_TEAM2ID: Dict[str, int] = {}
+# Équipes de la liste actuelle (les identifiants restent attribués aux équipes retirées)
+_known_teams: FrozenSet[str] = frozenset()
+
+def _index_teams(teams: List[str]) -> None:
+    """Attribue un identifiant entier stable à chaque nouvelle équipe."""
+    for team in teams:
+        if team not in _TEAM2ID:
+            _TEAM2ID[team] = len(_ID2TEAM)
+            _ID2TEAM.append(team)
+
+async def _team_from_id(team_id: str) -> Optional[str]:
+    """Retrouve l'équipe associée à l'identifiant d'un callback_data, ou None s'il est inconnu."""
+    try:
+        index = int(team_id)
+    except ValueError:
+        return None
+    
+    # Copie locale récente (aucun appel réseau); après un redémarrage, reconstruit l'index
+    await _cached_teams()
+    
+    if 0 <= index < len(_ID2TEAM):
+        team = _ID2TEAM[index]
+        # Écarter une équipe retirée de la liste depuis l'affichage du clavier
+        if team in _known_teams:
+            return team
+    return None
+
+# Copie locale de la liste des équipes, partagée par toutes les pages de sélection
+TEAMS_CACHE_TTL = 60  # secondes
+_teams_cache: List[str] = []
+_teams_cache_time = 0.0
+# Pages de sélection précalculées à chaque rechargement de la liste
+_teams_pages: List[List[str]] = []
+# Claviers des pages déjà construits: {(is_team1, page): InlineKeyboardMarkup}
+_teams_markups: Dict[Tuple[bool, int], InlineKeyboardMarkup] = {}
+
+async def _cached_teams() -> List[str]:
+    """Retourne la liste des équipes, rechargée depuis l'adaptateur au plus une fois par TEAMS_CACHE_TTL."""
+    global _teams_cache, _teams_cache_time, _teams_pages, _known_teams
+    
+    if _teams_cache and time.monotonic() - _teams_cache_time < TEAMS_CACHE_TTL:
+        return _teams_cache
+    
+    # Lecture hors de la boucle asyncio (get_all_teams est synchrone)
+    teams = await get_all_teams_async()
+    if teams:
+        _index_teams(teams)
+        _teams_cache = teams
+        _teams_pages = [teams[i:i + TEAMS_PER_PAGE] for i in range(0, len(teams), TEAMS_PER_PAGE)]
+        _teams_markups.clear()
+        _known_teams = frozenset(teams)
+        _teams_cache_time = time.monotonic()
+        logger.info(f"Liste des équipes rechargée: {len(teams)} équipes, {len(_teams_pages)} pages")
+    
+    return teams or []
+
+async def _cached_team_pages() -> List[List[str]]:
+    """Retourne la liste des équipes découpée en pages de TEAMS_PER_PAGE."""
+    await _cached_teams()
+    return _teams_pages
+
+def _team_page_markup(page: int, is_team1: bool) -> InlineKeyboardMarkup:
+    """Retourne le clavier d'une page de sélection, construit une seule fois par rechargement."""
+    key = (is_team1, page)
+    markup = _teams_markups.get(key)
+    if markup is not None:
+        return markup
+    
+    page_teams = _teams_pages[page]
+    total_pages = len(_teams_pages)
+    
+    # Créer les boutons pour les équipes (grille de 2 colonnes)
+    callback_prefix = "select_team1_" if is_team1 else "select_team2_"
+    
+    team_buttons = [
+        [InlineKeyboardButton(team, callback_data=f"{callback_prefix}{_TEAM2ID[team]}") for team in page_teams[i:i + 2]]
+        for i in range(0, len(page_teams), 2)
+    ]
+    
+    # Ajouter les boutons de navigation
+    nav_buttons = []
+    
+    if page > 0:
+        nav_buttons.append(InlineKeyboardButton("◀️ Précédent", callback_data=f"teams_page_{page-1}"))
+    
+    if page < total_pages - 1:
+        nav_buttons.append(InlineKeyboardButton("Suivant ▶️", callback_data=f"teams_page_{page+1}"))
+    
+    if nav_buttons:
+        team_buttons.append(nav_buttons)
+    
+    # Ajouter bouton pour revenir en arrière si nécessaire
+    if not is_team1:
+        team_buttons.append([InlineKeyboardButton("◀️ Retour", callback_data="fifa_select_teams")])
+    else:
+        team_buttons.append([InlineKeyboardButton("🎮 Menu principal", callback_data="show_games")])
+    
+    markup = InlineKeyboardMarkup(team_buttons)
+    _teams_markups[key] = markup
+    return markup
+
 # Fonction principale pour le jeu FIFA 4x4
 async def start_fifa_game(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Lance le jeu FIFA 4x4 Predictor."""
@@ -74,8 +216,16 @@ async def handle_fifa_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         await start_team_selection(query.message, context, edit=True)
     
     elif callback_data.startswith("select_team1_"):
-        # Extraire le nom de l'équipe 1
-        team1 = callback_data.replace("select_team1_", "")
+        # Retrouver l'équipe 1 à partir de son identifiant
+        team1 = await _team_from_id(callback_data.removeprefix("select_team1_"))
+        if team1 is None:
+            await query.edit_message_text(
+                "❌ *Erreur de sélection*\n\n"
+                "Veuillez recommencer la procédure de sélection des équipes.",
+                parse_mode='Markdown'
+            )
+            return
+        
         context.user_data["team1"] = team1
         context.user_data["selecting_team1"] = False
         
@@ -86,19 +236,22 @@ async def handle_fifa_callback(update: Update, context: ContextTypes.DEFAULT_TYP
             f"🎯 *{team1}* sélectionné!"
         ]
         
+        # Éditions limitées à une par seconde: les images intermédiaires trop rapprochées sont sautées
+        editor = ThrottledEditor(query.message, user_id=query.from_user.id)
         for frame in anim_frames:
-            await query.edit_message_text(frame, parse_mode='Markdown')
+            editor.edit(frame, parse_mode='Markdown')
             await asyncio.sleep(0.3)
+        await editor.close()
         
         # Puis passer à la sélection de l'équipe 2
         await start_team2_selection(query.message, context, edit=True)
     
     elif callback_data.startswith("select_team2_"):
-        # Extraire le nom de l'équipe 2
-        team2 = callback_data.replace("select_team2_", "")
+        # Retrouver l'équipe 2 à partir de son identifiant
+        team2 = await _team_from_id(callback_data.removeprefix("select_team2_"))
         team1 = context.user_data.get("team1", "")
         
-        if not team1:
+        if not team1 or team2 is None:
             await query.edit_message_text(
                 "❌ *Erreur de sélection*\n\n"
                 "Veuillez recommencer la procédure de sélection des équipes.",
@@ -116,9 +269,12 @@ async def handle_fifa_callback(update: Update, context: ContextTypes.DEFAULT_TYP
             f"🎯 *{team2}* sélectionné!"
         ]
         
+        # Éditions limitées à une par seconde: les images intermédiaires trop rapprochées sont sautées
+        editor = ThrottledEditor(query.message, user_id=query.from_user.id)
         for frame in anim_frames:
-            await query.edit_message_text(frame, parse_mode='Markdown')
+            editor.edit(frame, parse_mode='Markdown')
             await asyncio.sleep(0.3)
+        await editor.close()
         
         # Demander la première cote
         await query.edit_message_text(
@@ -130,7 +286,7 @@ async def handle_fifa_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         )
         
         # Passer en mode conversation pour recevoir les cotes
-        context.user_data["awaiting_odds_team1"] = True
+        context.user_data["flow"] = Flow.AWAIT_ODDS1
         context.user_data["odds_for_match"] = f"{team1} vs {team2}"
         
         return ODDS_INPUT_TEAM1
@@ -148,9 +304,7 @@ async def start_team_selection(message, context, edit=False, page=0) -> None:
         context.user_data["selecting_team1"] = True
         await show_teams_page(message, context, page, edit, is_team1=True)
     except Exception as e:
-        logger.error(f"Erreur lors du démarrage de la sélection d'équipes: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.error(f"Erreur lors du démarrage de la sélection d'équipes: {e}", exc_info=True)
         
         if edit:
             await message.edit_text(
@@ -167,11 +321,11 @@ async def start_team_selection(message, context, edit=False, page=0) -> None:
 async def show_teams_page(message, context, page=0, edit=False, is_team1=True) -> None:
     """Affiche une page de la liste des équipes."""
     try:
-        # Récupérer toutes les équipes depuis l'adaptateur
-        teams = get_all_teams()
+        # Récupérer les pages d'équipes (copie locale, puis adaptateur)
+        pages = await _cached_team_pages()
         
         # Vérifier si des équipes ont été trouvées
-        if not teams:
+        if not pages:
             logger.error("Aucune équipe trouvée dans la base de données")
             error_message = "Aucune équipe disponible. Veuillez contacter l'administrateur."
             
@@ -181,51 +335,14 @@ async def show_teams_page(message, context, page=0, edit=False, is_team1=True) -
                 await message.reply_text(error_message, parse_mode='Markdown')
             return
             
-        logger.info(f"Nombre d'équipes trouvées: {len(teams)}")
-        logger.info(f"Premières équipes: {teams[:5] if len(teams) >= 5 else teams}")
-        
-        # Calculer le nombre total de pages
-        total_pages = (len(teams) + TEAMS_PER_PAGE - 1) // TEAMS_PER_PAGE
+        # Nombre total de pages
+        total_pages = len(pages)
         
         # S'assurer que la page est valide
         page = max(0, min(page, total_pages - 1))
         
-        # Obtenir les équipes pour cette page
-        start_idx = page * TEAMS_PER_PAGE
-        end_idx = min(start_idx + TEAMS_PER_PAGE, len(teams))
-        page_teams = teams[start_idx:end_idx]
-        
-        # Créer les boutons pour les équipes
-        team_buttons = []
-        row = []
-        
-        callback_prefix = "select_team1_" if is_team1 else "select_team2_"
-        
-        for i, team in enumerate(page_teams):
-            row.append(InlineKeyboardButton(team, callback_data=f"{callback_prefix}{team}"))
-            if len(row) == 2 or i == len(page_teams) - 1:
-                team_buttons.append(row)
-                row = []
-        
-        # Ajouter les boutons de navigation
-        nav_buttons = []
-        
-        if page > 0:
-            nav_buttons.append(InlineKeyboardButton("◀️ Précédent", callback_data=f"teams_page_{page-1}"))
-        
-        if page < total_pages - 1:
-            nav_buttons.append(InlineKeyboardButton("Suivant ▶️", callback_data=f"teams_page_{page+1}"))
-        
-        if nav_buttons:
-            team_buttons.append(nav_buttons)
-        
-        # Ajouter bouton pour revenir en arrière si nécessaire
-        if not is_team1:
-            team_buttons.append([InlineKeyboardButton("◀️ Retour", callback_data="fifa_select_teams")])
-        else:
-            team_buttons.append([InlineKeyboardButton("🎮 Menu principal", callback_data="show_games")])
-        
-        reply_markup = InlineKeyboardMarkup(team_buttons)
+        # Clavier de la page (mis en cache jusqu'au prochain rechargement)
+        reply_markup = _team_page_markup(page, is_team1)
         
         # Texte du message
         team_type = "première" if is_team1 else "deuxième"
@@ -239,9 +356,7 @@ async def show_teams_page(message, context, page=0, edit=False, is_team1=True) -
         else:
             await message.reply_text(text, reply_markup=reply_markup, parse_mode='Markdown')
     except Exception as e:
-        logger.error(f"Erreur lors de l'affichage des équipes: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.error(f"Erreur lors de l'affichage des équipes: {e}", exc_info=True)
         
         if edit:
             await message.edit_text(
@@ -278,7 +393,7 @@ async def start_team2_selection(message, context, edit=False, page=0) -> None:
 # Gestionnaire pour la saisie de la cote de l'équipe 1
 async def handle_odds_team1_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Gère la saisie de la cote pour la première équipe."""
-    if not context.user_data.get("awaiting_odds_team1", False):
+    if context.user_data.get("flow") != Flow.AWAIT_ODDS1:
         return ConversationHandler.END
     
     # Vérifier si c'est un admin
@@ -315,56 +430,49 @@ async def handle_odds_team1_input(update: Update, context: ContextTypes.DEFAULT_
     team1 = context.user_data.get("team1", "")
     team2 = context.user_data.get("team2", "")
     
-    # Extraire la cote
-    try:
-        odds1 = float(user_input.replace(",", "."))
-        
-        # Vérifier que la cote est valide
-        if odds1 < 1.01:
-            await update.message.reply_text(
-                "❌ *Valeur de cote invalide*\n\n"
-                "La cote doit être supérieure à 1.01.",
-                parse_mode='Markdown'
-            )
-            return ODDS_INPUT_TEAM1
-        
-        # Sauvegarder la cote
-        context.user_data["odds1"] = odds1
-        context.user_data["awaiting_odds_team1"] = False
-        
-        # Animation de validation de la cote
-        loading_message = await update.message.reply_text(
-            f"✅ Cote de *{team1}* enregistrée: *{odds1}*",
-            parse_mode='Markdown'
-        )
-        
-        # Demander la cote de l'équipe 2
-        await asyncio.sleep(0.5)
-        await loading_message.edit_text(
-            f"💰 *Saisie des cotes (obligatoire)*\n\n"
-            f"Match: *{team1}* vs *{team2}*\n\n"
-            f"Veuillez maintenant saisir la cote pour *{team2}*\n\n"
-            f"_Exemple: 2.35_",
-            parse_mode='Markdown'
-        )
-        
-        # Passer à l'attente de la cote de l'équipe 2
-        context.user_data["awaiting_odds_team2"] = True
-        
-        return ODDS_INPUT_TEAM2
-    except ValueError:
+    # Extraire la cote (validation par expression régulière, sans exception sur une saisie invalide)
+    odds1 = _parse_odds(user_input)
+    if odds1 is None:
         await update.message.reply_text(
-            "❌ *Format incorrect*\n\n"
-            f"Veuillez saisir uniquement la valeur numérique de la cote pour *{team1}*.\n\n"
-            "Exemple: `1.85`",
+            _TPL_ODDS_FORMAT_ERROR.format(team=team1, example="1.85"),
             parse_mode='Markdown'
         )
         return ODDS_INPUT_TEAM1
+    
+    # Vérifier que la cote est valide
+    if odds1 < 1.01:
+        await update.message.reply_text(_MSG_INVALID_ODDS, parse_mode='Markdown')
+        return ODDS_INPUT_TEAM1
+    
+    # Sauvegarder la cote
+    context.user_data["odds1"] = odds1
+    context.user_data["flow"] = Flow.IDLE
+    
+    # Animation de validation de la cote
+    loading_message = await update.message.reply_text(
+        f"✅ Cote de *{team1}* enregistrée: *{odds1}*",
+        parse_mode='Markdown'
+    )
+    
+    # Demander la cote de l'équipe 2
+    await asyncio.sleep(0.5)
+    await loading_message.edit_text(
+        f"💰 *Saisie des cotes (obligatoire)*\n\n"
+        f"Match: *{team1}* vs *{team2}*\n\n"
+        f"Veuillez maintenant saisir la cote pour *{team2}*\n\n"
+        f"_Exemple: 2.35_",
+        parse_mode='Markdown'
+    )
+    
+    # Passer à l'attente de la cote de l'équipe 2
+    context.user_data["flow"] = Flow.AWAIT_ODDS2
+    
+    return ODDS_INPUT_TEAM2
 
 # Gestionnaire pour la saisie de la cote de l'équipe 2
 async def handle_odds_team2_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Gère la saisie de la cote pour la deuxième équipe."""
-    if not context.user_data.get("awaiting_odds_team2", False):
+    if context.user_data.get("flow") != Flow.AWAIT_ODDS2:
         return ConversationHandler.END
     
     # Vérifier si c'est un admin
@@ -402,139 +510,125 @@ async def handle_odds_team2_input(update: Update, context: ContextTypes.DEFAULT_
     team2 = context.user_data.get("team2", "")
     odds1 = context.user_data.get("odds1", 0)
     
-    # Extraire la cote
+    # Extraire la cote (validation par expression régulière, sans exception sur une saisie invalide)
+    odds2 = _parse_odds(user_input)
+    if odds2 is None:
+        await update.message.reply_text(
+            _TPL_ODDS_FORMAT_ERROR.format(team=team2, example="2.35"),
+            parse_mode='Markdown'
+        )
+        return ODDS_INPUT_TEAM2
+    
+    # Vérifier que la cote est valide
+    if odds2 < 1.01:
+        await update.message.reply_text(_MSG_INVALID_ODDS, parse_mode='Markdown')
+        return ODDS_INPUT_TEAM2
+    
+    # Sauvegarder la cote
+    context.user_data["odds2"] = odds2
+    context.user_data["flow"] = Flow.IDLE
+    
+    # Lancer la prédiction tout de suite: elle se calcule pendant l'animation d'analyse
+    # (prédicteur partagé avec le bot, données chargées une seule fois)
+    prediction_task = asyncio.create_task(get_match_predictor().predict_match(team1, team2, odds1, odds2))
+    
+    # Animation de validation de la cote
+    loading_message = await update.message.reply_text(
+        f"✅ Cote de *{team2}* enregistrée: *{odds2}*",
+        parse_mode='Markdown'
+    )
+    
+    # Animation de génération de prédiction (au plus une édition par seconde)
+    editor = ThrottledEditor(loading_message, user_id=user_id)
+    await asyncio.sleep(0.3)
+    editor.edit("🧠 *Analyse des données en cours...*", parse_mode='Markdown')
+    
+    # Animation stylisée pour l'analyse
+    analysis_frames = [
+        "📊 *Analyse des performances historiques...*",
+        "🏆 *Analyse des confrontations directes...*",
+        "⚽ *Calcul des probabilités de scores...*",
+        "📈 *Finalisation des prédictions...*"
+    ]
+    
+    for frame in analysis_frames:
+        await asyncio.sleep(0.3)
+        editor.edit(frame, parse_mode='Markdown')
+    
+    # Récupération de la prédiction (généralement déjà prête à la fin de l'animation)
     try:
-        odds2 = float(user_input.replace(",", "."))
+        prediction = await prediction_task
         
-        # Vérifier que la cote est valide
-        if odds2 < 1.01:
-            await update.message.reply_text(
-                "❌ *Valeur de cote invalide*\n\n"
-                "La cote doit être supérieure à 1.01.",
+        if not prediction or "error" in prediction:
+            error_msg = prediction.get("error", "Erreur inconnue") if prediction else "Impossible de générer une prédiction"
+            
+            # Proposer de réessayer
+            reply_markup = _NEW_PREDICTION_MARKUP
+            
+            await editor.final(
+                f"❌ *Erreur de prédiction*\n\n"
+                f"{error_msg}\n\n"
+                f"Veuillez essayer avec d'autres équipes.",
+                reply_markup=reply_markup,
                 parse_mode='Markdown'
             )
-            return ODDS_INPUT_TEAM2
+            return ConversationHandler.END
+        
+        # Formater et envoyer la prédiction
+        prediction_text = format_prediction_message(prediction)
         
-        # Sauvegarder la cote
-        context.user_data["odds2"] = odds2
-        context.user_data["awaiting_odds_team2"] = False
+        # Animation finale avant d'afficher le résultat
+        final_frames = [
+            "🎯 *Prédiction prête!*",
+            "✨ *Affichage des résultats...*"
+        ]
         
-        # Animation de validation de la cote
-        loading_message = await update.message.reply_text(
-            f"✅ Cote de *{team2}* enregistrée: *{odds2}*",
+        for frame in final_frames:
+            await asyncio.sleep(0.3)
+            editor.edit(frame, parse_mode='Markdown')
+        
+        # Proposer une nouvelle prédiction
+        reply_markup = _NEW_PREDICTION_MARKUP
+        
+        await editor.final(
+            prediction_text,
+            reply_markup=reply_markup,
             parse_mode='Markdown'
         )
         
-        # Animation de génération de prédiction
-        await asyncio.sleep(0.3)
-        await loading_message.edit_text(
-            "🧠 *Analyse des données en cours...*",
-            parse_mode='Markdown'
+        # Enregistrer la prédiction dans les logs (écriture par lots en arrière-plan)
+        user_id = context.user_data.get("user_id", update.message.from_user.id)
+        username = context.user_data.get("username", update.message.from_user.username)
+        
+        queue_prediction_log(
+            user_id=user_id,
+            username=username,
+            team1=team1,
+            team2=team2,
+            odds1=odds1,
+            odds2=odds2,
+            prediction_result=prediction
         )
         
-        # Animation stylisée pour l'analyse
-        analysis_frames = [
-            "📊 *Analyse des performances historiques...*",
-            "🏆 *Analyse des confrontations directes...*",
-            "⚽ *Calcul des probabilités de scores...*",
-            "📈 *Finalisation des prédictions...*"
-        ]
+        return ConversationHandler.END
+    except Exception as e:
+        logger.error(f"Erreur lors de la génération de la prédiction: {e}", exc_info=True)
         
-        for frame in analysis_frames:
-            await asyncio.sleep(0.3)
-            await loading_message.edit_text(frame, parse_mode='Markdown')
+        # Proposer de réessayer en cas d'erreur
+        reply_markup = _NEW_PREDICTION_MARKUP
         
-        # Génération de la prédiction
-        try:
-            prediction = predictor.predict_match(team1, team2, odds1, odds2)
-            
-            if not prediction or "error" in prediction:
-                error_msg = prediction.get("error", "Erreur inconnue") if prediction else "Impossible de générer une prédiction"
-                
-                # Proposer de réessayer
-                keyboard = [
-                    [InlineKeyboardButton("🔄 Nouvelle prédiction", callback_data="fifa_new_prediction")],
-                    [InlineKeyboardButton("🎮 Accueil", callback_data="show_games")]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                
-                await loading_message.edit_text(
-                    f"❌ *Erreur de prédiction*\n\n"
-                    f"{error_msg}\n\n"
-                    f"Veuillez essayer avec d'autres équipes.",
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown'
-                )
-                return ConversationHandler.END
-            
-            # Formater et envoyer la prédiction
-            prediction_text = format_prediction_message(prediction)
-            
-            # Animation finale avant d'afficher le résultat
-            final_frames = [
-                "🎯 *Prédiction prête!*",
-                "✨ *Affichage des résultats...*"
-            ]
-            
-            for frame in final_frames:
-                await asyncio.sleep(0.3)
-                await loading_message.edit_text(frame, parse_mode='Markdown')
-            
-            # Proposer une nouvelle prédiction
-            keyboard = [
-                [InlineKeyboardButton("🔄 Nouvelle prédiction", callback_data="fifa_new_prediction")],
-                [InlineKeyboardButton("🎮 Accueil", callback_data="show_games")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await loading_message.edit_text(
-                prediction_text,
-                reply_markup=reply_markup,
-                parse_mode='Markdown'
-            )
-            
-            # Enregistrer la prédiction dans les logs
-            user_id = context.user_data.get("user_id", update.message.from_user.id)
-            username = context.user_data.get("username", update.message.from_user.username)
-            
-            save_prediction_log(
-                user_id=user_id,
-                username=username,
-                team1=team1,
-                team2=team2,
-                odds1=odds1,
-                odds2=odds2,
-                prediction_result=prediction
-            )
-            
-            return ConversationHandler.END
-        except Exception as e:
-            logger.error(f"Erreur lors de la génération de la prédiction: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            
-            # Proposer de réessayer en cas d'erreur
-            keyboard = [
-                [InlineKeyboardButton("🔄 Nouvelle prédiction", callback_data="fifa_new_prediction")],
-                [InlineKeyboardButton("🎮 Accueil", callback_data="show_games")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await loading_message.edit_text(
-                "❌ *Une erreur s'est produite lors de la génération de la prédiction*\n\n"
-                "Veuillez réessayer avec d'autres équipes ou contacter l'administrateur.",
-                reply_markup=reply_markup,
-                parse_mode='Markdown'
-            )
-            return ConversationHandler.END
-    except ValueError:
-        await update.message.reply_text(
-            "❌ *Format incorrect*\n\n"
-            f"Veuillez saisir uniquement la valeur numérique de la cote pour *{team2}*.\n\n"
-            "Exemple: `2.35`",
+        await editor.final(
+            "❌ *Une erreur s'est produite lors de la génération de la prédiction*\n\n"
+            "Veuillez réessayer avec d'autres équipes ou contacter l'administrateur.",
+            reply_markup=reply_markup,
             parse_mode='Markdown'
         )
-        return ODDS_INPUT_TEAM2
+        return ConversationHandler.END
+
+# Repli /cancel des gestionnaires de conversation (fifa_bot.py et fifa_games.py)
+async def cancel_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Termine la conversation en cours."""
+    return ConversationHandler.END
 
 # Cette fonction est appelée depuis fifa_games.py pour traiter les messages entrants
 # concernant les cotes pour FIFA
@@ -552,10 +646,11 @@ async def handle_fifa_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         pass
         
     # Vérifier si nous attendons une cote
-    if context.user_data.get("awaiting_odds_team1", False):
+    flow = context.user_data.get("flow", Flow.IDLE)
+    if flow == Flow.AWAIT_ODDS1:
         return await handle_odds_team1_input(update, context)
     
-    if context.user_data.get("awaiting_odds_team2", False):
+    if flow == Flow.AWAIT_ODDS2:
         return await handle_odds_team2_input(update, context)
     
     return None
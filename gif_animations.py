@@ -2,7 +2,7 @@ import logging
 import asyncio
 from typing import Optional, Union, Dict
 from telegram import Message, Bot, InlineKeyboardMarkup
-from queue_manager import send_message_queued, edit_message_queued
+from queue_manager import send_message_queued, edit_message_queued, get_shared_bot
 
 # Configuration du logging
 logging.basicConfig(
@@ -65,7 +65,8 @@ async def send_animated_message(
     reply_markup: InlineKeyboardMarkup = None,
     edit: bool = False,
     user_id: int = None,
-    animation_duration: float = 3.0
+    animation_duration: float = 3.0,
+    disable_notification: bool = False
 ) -> Message:
     """
     Envoie un message avec une animation GIF Telegram, puis le remplace par le texte final.
@@ -80,6 +81,7 @@ async def send_animated_message(
         edit (bool): Si True, édite le message au lieu d'en envoyer un nouveau
         user_id (int, optional): ID de l'utilisateur pour le suivi
         animation_duration (float): Durée de l'animation en secondes
+        disable_notification (bool): Si True, un nouveau message est envoyé sans notification
         
     Returns:
         Message: Le message final
@@ -108,7 +110,8 @@ async def send_animated_message(
                     text=text,
                     parse_mode='Markdown',
                     user_id=user_id,
-                    high_priority=True
+                    high_priority=True,
+                    disable_notification=disable_notification
                 )
         
         # Envoyer ou éditer le message avec l'animation
@@ -123,10 +126,7 @@ async def send_animated_message(
             )
         else:
             # Envoyer un nouveau message avec l'animation
-            from telegram import Bot, Animation
-            from config import TELEGRAM_TOKEN
-            
-            bot = Bot(token=TELEGRAM_TOKEN)
+            bot = get_shared_bot()
             
             async def _send_animation():
                 try:
@@ -134,14 +134,16 @@ async def send_animated_message(
                         chat_id=message.chat_id,
                         animation=animation_id,
                         caption=text,
-                        parse_mode='Markdown'
+                        parse_mode='Markdown',
+                        disable_notification=disable_notification
                     )
                 except Exception as e:
                     logger.warning(f"Erreur lors de l'envoi de l'animation: {e}. Utilisation du texte uniquement.")
                     return await bot.send_message(
                         chat_id=message.chat_id,
                         text=text,
-                        parse_mode='Markdown'
+                        parse_mode='Markdown',
+                        disable_notification=disable_notification
                     )
             
             # Utiliser la file d'attente pour l'envoi de l'animation
@@ -217,26 +219,28 @@ async def send_verification_animation(
         text="🔍 *Vérification en cours...*",
         edit=edit,
         user_id=user_id,
-        animation_duration=loading_duration
+        animation_duration=loading_duration,
+        disable_notification=True  # Message transitoire, remplacé par le résultat
     )
     
-    # Puis afficher l'animation de succès ou d'échec
-    subtype = "success" if success else "failure"
-    
     if not final_text:
         final_text = "✅ *Vérification réussie!*" if success else "❌ *Vérification échouée!*"
     
-    return await send_animated_message(
-        message=loading_msg,
-        animation_type="verification",
-        animation_subtype=subtype,
-        text=None,
-        final_text=final_text,
-        reply_markup=reply_markup,
-        edit=True,
-        user_id=user_id,
-        animation_duration=1.0  # Plus court pour cette seconde phase
-    )
+    # Puis afficher directement le résultat: la vérification est déjà terminée,
+    # une étape intermédiaire ne ferait qu'ajouter une attente et un appel API
+    try:
+        return await edit_message_queued(
+            message=loading_msg,
+            text=final_text,
+            parse_mode='Markdown',
+            reply_markup=reply_markup,
+            disable_web_page_preview=True,
+            user_id=user_id,
+            high_priority=True
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de l'affichage du résultat de vérification: {e}")
+        return loading_msg
 
 async def send_prediction_animation(
     message: Message,
@@ -393,5 +397,6 @@ async def show_waiting_animation(
             text=waiting_text,
             parse_mode='Markdown',
             user_id=user_id,
-            high_priority=False  # Priorité plus basse pour les notifications d'attente
+            high_priority=False,  # Priorité plus basse pour les notifications d'attente
+            disable_notification=True
         )
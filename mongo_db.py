@@ -249,6 +249,48 @@ def save_prediction_log(user_id, username, team1, team2, odds1=None, odds2=None,
         logger.info(f"Prédiction non stockée pour {username} (ID: {user_id}): {team1} vs {team2}")
         return False
 
+def save_prediction_logs_bulk(entries: List[Dict[str, Any]]) -> bool:
+    """Enregistre un lot de prédictions en une seule requête insert_many"""
+    if not entries:
+        return True
+
+    try:
+        db = get_database()
+        if db is None:
+            logger.error("Impossible de se connecter à la base de données pour enregistrer les prédictions")
+            logger.info(f"{len(entries)} prédiction(s) non stockée(s)")
+            return False
+
+        current_time = datetime.now().isoformat()
+        prediction_logs = []
+
+        for entry in entries:
+            odds1 = entry.get("odds1")
+            odds2 = entry.get("odds2")
+            prediction_result = entry.get("prediction_result")
+
+            prediction_logs.append({
+                "user_id": str(entry.get("user_id")),
+                "username": entry.get("username"),
+                "date": current_time,
+                "team1": entry.get("team1"),
+                "team2": entry.get("team2"),
+                "odds1": float(odds1) if odds1 is not None else None,
+                "odds2": float(odds2) if odds2 is not None else None,
+                "prediction_result": prediction_result,
+                "status": "success" if prediction_result and "error" not in prediction_result else "failed"
+            })
+
+        # Insérer tout le lot dans la collection
+        db.prediction_logs.insert_many(prediction_logs, ordered=False)
+
+        logger.info(f"{len(prediction_logs)} prédiction(s) enregistrée(s) en une seule opération")
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement groupé des prédictions: {e}")
+        logger.info(f"{len(entries)} prédiction(s) non stockée(s)")
+        return False
+
 async def check_user_subscription(user_id):
     """
     Vérifie si un utilisateur est abonné au canal @alvecapitalofficiel.
@@ -260,9 +302,8 @@ async def check_user_subscription(user_id):
         bool: True si l'utilisateur est abonné, False sinon
     """
     try:
-        from telegram import Bot
-        from telegram.error import TelegramError
-        from config import TELEGRAM_TOKEN
+        from telegram.error import TelegramError, RetryAfter
+        from queue_manager import get_shared_bot
         
         # Vérifier si c'est un admin
         from admin_access import is_admin
@@ -270,13 +311,11 @@ async def check_user_subscription(user_id):
             logger.info(f"Vérification d'abonnement contournée pour l'admin (ID: {user_id})")
             return True
         
-        bot = Bot(token=TELEGRAM_TOKEN)
-        
         # Identifiant du canal @alvecapitalofficiel
         channel_id = "@alvecapitalofficiel"
         
-        # Vérifier si l'utilisateur est membre du canal
-        chat_member = await bot.get_chat_member(chat_id=channel_id, user_id=user_id)
+        # Vérifier si l'utilisateur est membre du canal (client partagé: connexions réutilisées)
+        chat_member = await get_shared_bot().get_chat_member(chat_id=channel_id, user_id=user_id)
         
         # Les statuts qui indiquent une adhésion active au canal
         valid_statuses = ['creator', 'administrator', 'member']
@@ -286,6 +325,9 @@ async def check_user_subscription(user_id):
         
         return is_member
     
+    except RetryAfter:
+        # Laisser l'appelant gérer la limite de débit (attente puis nouvel essai)
+        raise
     except TelegramError as e:
         logger.error(f"Erreur lors de la vérification de l'abonnement: {e}")
         return False
@@ -478,13 +520,11 @@ async def verify_and_update_referral(user_id, referrer_id):
                 
                 # Notification au parrain
                 try:
-                    from telegram import Bot
-                    from config import TELEGRAM_TOKEN
+                    from queue_manager import get_shared_bot
                     
-                    bot = Bot(token=TELEGRAM_TOKEN)
                     referral_count = await count_referrals(referrer_id)
                     
-                    await bot.send_message(
+                    await get_shared_bot().send_message(
                         chat_id=referrer_id,
                         text=f"🎉 *Félicitations!* Un nouvel utilisateur a utilisé votre lien et s'est abonné au canal.\n\n"
                              f"Vous avez maintenant *{referral_count}/{await get_max_referrals()}* parrainages vérifiés.",
@@ -1,5 +1,6 @@
 from collections import defaultdict, Counter
 import logging
+import asyncio
 from typing import Dict, List, Tuple, Optional, Any
 import math
 import re
@@ -10,8 +11,7 @@ from config import MAX_PREDICTIONS_HALF_TIME, MAX_PREDICTIONS_FULL_TIME
 # Importer notre nouveau système de cache
 from cache_system import (
     get_cached_prediction, cache_prediction,
-    get_cached_teams, cache_teams,
-    get_cached_matches, cache_matches
+    get_cached_teams, cache_teams
 )
 
 # Configuration du logging
@@ -21,6 +21,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Caractères retirés lors de la normalisation des noms d'équipes (motif compilé une seule fois)
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s]')
+
 class MatchPredictor:
     """
     Classe optimisée pour la prédiction de matchs FIFA 4x4.
@@ -31,54 +34,39 @@ class MatchPredictor:
         self.team_stats = None
         self.match_id_trends = None
         self.teams_mapping = {}  # Dictionnaire pour normaliser les noms d'équipes
+        self._preload_task: Optional[asyncio.Task] = None
         
-        # Précharger les données au démarrage
-        self._preload_data()
+        # Les données sont chargées par preload_prediction_data() au démarrage (en arrière-plan),
+        # ou à défaut au premier appel de predict_match()
+    
+    async def _ensure_data(self):
+        """Charge les données en partageant le chargement en cours (un seul chargement à la fois)."""
+        if self._preload_task is None or self._preload_task.done():
+            self._preload_task = asyncio.create_task(self._preload_data())
+        await asyncio.shield(self._preload_task)
     
     async def _preload_data(self):
         """Précharge les données statiques en arrière-plan"""
         try:
-            # Vérifier d'abord si les données sont déjà en cache
-            cached_matches = await get_cached_matches()
-            
-            if cached_matches:
-                logger.info("Données de matches trouvées en cache")
-                self.matches = cached_matches
-                
-                # Calculer les statistiques à partir des matches en cache
-                self.team_stats = self._calculate_team_statistics(self.matches)
-                self.match_id_trends = self._calculate_match_id_trends(self.matches)
-                self._create_teams_mapping()
-                
-                # Mettre en cache la liste des équipes si ce n'est pas déjà fait
-                teams = list(self.team_stats.keys())
-                cached_teams = await get_cached_teams()
-                if not cached_teams:
-                    await cache_teams(teams)
-                    
-                logger.info(f"Données préchargées depuis le cache: {len(self.matches)} matches, {len(teams)} équipes")
-                return
-            
-            # Si pas en cache, charger depuis la base de données
-            logger.info("Préchargement des données depuis la base de données...")
-            from database_adapter import get_all_matches_data
-            self.matches = get_all_matches_data()
+            # Cache partagé d'abord, sinon base de données: get_all_matches_data_async fait les deux
+            # (lecture exécutée dans un thread pour ne pas bloquer la boucle du bot, mise en cache incluse)
+            logger.info("Préchargement des données de matches...")
+            from database_adapter import get_all_matches_data_async
+            self.matches = await get_all_matches_data_async()
             
             if self.matches:
-                # Mettre en cache pour utilisation future
-                await cache_matches(self.matches)
-                
                 # Calculer les statistiques pour améliorer les performances
                 self.team_stats = self._calculate_team_statistics(self.matches)
                 self.match_id_trends = self._calculate_match_id_trends(self.matches)
                 
-                # Créer un dictionnaire de correspondance des noms d'équipes
                 # Créer un dictionnaire de correspondance des noms d'équipes
                 self._create_teams_mapping()
                 
-                # Mettre en cache la liste des équipes
+                # Mettre en cache la liste des équipes si ce n'est pas déjà fait
                 teams = list(self.team_stats.keys())
-                await cache_teams(teams)
+                cached_teams = await get_cached_teams()
+                if not cached_teams:
+                    await cache_teams(teams)
                 
                 logger.info(f"Données préchargées: {len(self.matches)} matches, {len(teams)} équipes")
             else:
@@ -108,7 +96,7 @@ class MatchPredictor:
         
         # Convertir en minuscules et supprimer les caractères spéciaux
         normalized = team_name.lower()
-        normalized = re.sub(r'[^\w\s]', '', normalized)
+        normalized = _SPECIAL_CHARS_RE.sub('', normalized)
         normalized = normalized.strip()
         
         return normalized
@@ -162,7 +150,7 @@ class MatchPredictor:
         # Vérifier si les statistiques sont disponibles
         if not self.team_stats:
             logger.error("Statistiques d'équipes non disponibles")
-            await self._preload_data()  # Essayer de recharger les données
+            await self._ensure_data()  # Attendre le préchargement en cours, ou recharger les données
             
             # Vérifier à nouveau après le rechargement
             if not self.team_stats:
@@ -737,11 +725,18 @@ def format_prediction_message(prediction: Dict[str, Any]) -> str:
     
     return "\n".join(message)
 
-# Créer une instance unique du prédicteur (singleton)
-match_predictor = MatchPredictor()
+# Instance unique du prédicteur (singleton), créée à la première utilisation
+_match_predictor: Optional[MatchPredictor] = None
+
+def get_match_predictor() -> MatchPredictor:
+    """Retourne l'instance unique du prédicteur, en la créant si nécessaire."""
+    global _match_predictor
+    if _match_predictor is None:
+        _match_predictor = MatchPredictor()
+    return _match_predictor
 
 # Fonction asynchrone pour précharger les données au démarrage
 async def preload_prediction_data():
     """Précharge les données pour le prédicteur au démarrage de l'application."""
-    await match_predictor._preload_data()
+    await get_match_predictor()._ensure_data()
     logger.info("Préchargement des données de prédiction terminé")
@@ -375,9 +375,82 @@ class QueueManager:
             
         return status
 
+class AdaptiveRateLimiter:
+    """
+    Seau à jetons adaptatif pour un appel d'API Telegram donné.
+    Le débit augmente progressivement tant que les appels réussissent et
+    est divisé par deux dès que Telegram renvoie une erreur 429 (RetryAfter).
+    """
+    def __init__(self, rate: float = 20.0, min_rate: float = 1.0, max_rate: float = 30.0, increase_step: float = 0.5):
+        """
+        Initialise le limiteur.
+
+        Args:
+            rate (float): Débit initial en requêtes par seconde
+            min_rate (float): Débit minimal après réduction
+            max_rate (float): Débit maximal autorisé
+            increase_step (float): Augmentation du débit après chaque succès
+        """
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+
+        self.tokens = rate
+        self.last_refill = time.monotonic()
+        # Créé au premier acquire(): en Python 3.9, asyncio.Lock() se lie à la boucle courante dès
+        # sa construction, or l'instance globale est créée à l'import, avant la boucle du bot
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        """Attend qu'un jeton soit disponible puis le consomme."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1
+                self.last_refill = time.monotonic()
+
+            self.tokens -= 1
+
+    def on_success(self) -> None:
+        """Augmente le débit après un appel réussi."""
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttled(self) -> None:
+        """Réduit le débit après une erreur 429."""
+        self.rate = max(self.min_rate, self.rate * 0.5)
+        self.tokens = min(self.tokens, self.rate)
+        logger.warning(f"Limite de débit Telegram atteinte, débit réduit à {self.rate:.1f} req/s")
+
 # Instance globale du gestionnaire de file d'attente
 queue_manager = QueueManager()
 
+# Client Telegram partagé par les envois faits hors d'un gestionnaire: celui de l'application
+# (pool de connexions HTTP/2) une fois enregistré, sinon un Bot créé une seule fois
+_shared_bot: Optional[Bot] = None
+
+def set_shared_bot(bot: Bot) -> None:
+    """Enregistre le Bot de l'application comme client partagé."""
+    global _shared_bot
+    _shared_bot = bot
+
+def get_shared_bot() -> Bot:
+    """Retourne le Bot partagé; ses connexions HTTP sont réutilisées d'un appel à l'autre."""
+    global _shared_bot
+    if _shared_bot is None:
+        from config import TELEGRAM_TOKEN
+        _shared_bot = Bot(token=TELEGRAM_TOKEN)
+    return _shared_bot
+
+# Limiteur adaptatif pour les vérifications d'abonnement (getChatMember)
+subscription_rate_limiter = AdaptiveRateLimiter()
+
 # Fonction asynchrone pour démarrer le gestionnaire
 async def start_queue_manager():
     """Démarre le gestionnaire de file d'attente."""
@@ -413,7 +486,8 @@ def low_priority(func):
     return wrapper
 
 # Fonction helper pour ajouter une tâche d'envoi/édition de message à la file
-async def send_message_queued(chat_id, text, parse_mode=None, reply_markup=None, user_id=None, high_priority=True):
+async def send_message_queued(chat_id, text, parse_mode=None, reply_markup=None, user_id=None, high_priority=True,
+                              disable_web_page_preview=None, disable_notification=None):
     """
     Envoie un message via la file d'attente.
     
@@ -424,20 +498,20 @@ async def send_message_queued(chat_id, text, parse_mode=None, reply_markup=None,
         reply_markup: Markup pour les boutons
         user_id: ID de l'utilisateur pour le suivi
         high_priority: Si True, utilise la file haute priorité
+        disable_web_page_preview: Si True, désactive l'aperçu des liens
+        disable_notification: Si True, envoie le message sans notification (messages transitoires)
     
     Returns:
         Message: Le message envoyé
     """
-    from telegram import Bot
-    from config import TELEGRAM_TOKEN
-    
     async def _send_message():
-        bot = Bot(token=TELEGRAM_TOKEN)
-        return await bot.send_message(
+        return await get_shared_bot().send_message(
             chat_id=chat_id,
             text=text,
             parse_mode=parse_mode,
-            reply_markup=reply_markup
+            reply_markup=reply_markup,
+            disable_web_page_preview=disable_web_page_preview,
+            disable_notification=disable_notification
         )
     
     if high_priority:
@@ -447,7 +521,8 @@ async def send_message_queued(chat_id, text, parse_mode=None, reply_markup=None,
     
     return await future
 
-async def edit_message_queued(message, text, parse_mode=None, reply_markup=None, user_id=None, high_priority=True):
+async def edit_message_queued(message, text, parse_mode=None, reply_markup=None, user_id=None, high_priority=True,
+                              disable_web_page_preview=None):
     """
     Édite un message via la file d'attente.
     
@@ -458,6 +533,7 @@ async def edit_message_queued(message, text, parse_mode=None, reply_markup=None,
         reply_markup: Markup pour les boutons
         user_id: ID de l'utilisateur pour le suivi
         high_priority: Si True, utilise la file haute priorité
+        disable_web_page_preview: Si True, désactive l'aperçu des liens
     
     Returns:
         Message: Le message édité
@@ -466,7 +542,8 @@ async def edit_message_queued(message, text, parse_mode=None, reply_markup=None,
         return await message.edit_text(
             text=text,
             parse_mode=parse_mode,
-            reply_markup=reply_markup
+            reply_markup=reply_markup,
+            disable_web_page_preview=disable_web_page_preview
         )
     
     if high_priority:
@@ -476,6 +553,71 @@ async def edit_message_queued(message, text, parse_mode=None, reply_markup=None,
     
     return await future
 
+class ThrottledEditor:
+    """
+    Édite un même message au plus une fois par `min_interval` secondes (limite anti-flood de Telegram).
+    Les éditions demandées entre-temps sont fusionnées: seule la plus récente est envoyée.
+    """
+    def __init__(self, message, min_interval: float = 1.0, user_id: Optional[int] = None):
+        """
+        Initialise l'éditeur.
+
+        Args:
+            message: Message à éditer
+            min_interval (float): Intervalle minimal entre deux éditions, en secondes
+            user_id (int, optional): ID de l'utilisateur pour le suivi
+        """
+        self.message = message
+        self.min_interval = min_interval
+        self.user_id = user_id
+
+        self.last_edit = 0.0
+        self.pending: Optional[Tuple[str, Dict[str, Any]]] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def edit(self, text: str, **kwargs) -> None:
+        """Programme une édition intermédiaire (sans attendre); elle remplace celle encore en attente."""
+        self.pending = (text, kwargs)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        """Envoie la dernière édition en attente dès que l'intervalle minimal est écoulé."""
+        while self.pending is not None:
+            delay = self.last_edit + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.pending is None:
+                break
+
+            text, kwargs = self.pending
+            self.pending = None
+            self.last_edit = time.monotonic()
+            try:
+                await edit_message_queued(self.message, text, user_id=self.user_id, **kwargs)
+            except Exception as e:
+                logger.warning(f"Erreur lors d'une édition intermédiaire: {e}")
+
+    async def close(self) -> None:
+        """
+        Abandonne les éditions en attente, puis attend l'édition en cours et la fin de l'intervalle
+        minimal: le message peut ensuite être édité directement sans être écrasé.
+        """
+        self.pending = None
+        if self.task is not None:
+            await self.task
+            self.task = None
+
+        delay = self.last_edit + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def final(self, text: str, **kwargs):
+        """Affiche le texte final (toujours envoyé, après les éditions intermédiaires) et retourne le message édité."""
+        await self.close()
+        self.last_edit = time.monotonic()
+        return await edit_message_queued(self.message, text, user_id=self.user_id, **kwargs)
+
 # Fonction pour obtenir le statut actuel du système
 def get_system_load_status(total_queue_length=None):
     """
@@ -1,10 +1,11 @@
 import logging
 import asyncio
+import time
 from datetime import datetime
-from telegram import Bot
 from telegram.error import TelegramError
-from config import TELEGRAM_TOKEN, OFFICIAL_CHANNEL, MAX_REFERRALS
+from config import OFFICIAL_CHANNEL, MAX_REFERRALS
 from admin_access import is_admin
+from queue_manager import get_shared_bot
 
 # Configuration du logging
 logging.basicConfig(
@@ -76,15 +77,15 @@ async def create_referral_relationship(user_id, referrer_id):
             logger.error("Impossible de se connecter à la base de données pour créer un parrainage")
             return
         
-        # Vérifier si la relation existe déjà
-        existing_referral = db.referrals.find_one({
+        # Vérifier si la relation existe déjà (pymongo est synchrone: appels hors de la boucle d'événements)
+        existing_referral = await asyncio.to_thread(db.referrals.find_one, {
             "referrer_id": str(referrer_id),
             "referred_id": str(user_id)
         })
         
         if existing_referral is None:
             # Vérifier s'il n'y a pas de boucle de parrainage (A parraine B qui parraine A)
-            reverse_relation = db.referrals.find_one({
+            reverse_relation = await asyncio.to_thread(db.referrals.find_one, {
                 "referrer_id": str(user_id),
                 "referred_id": str(referrer_id)
             })
@@ -94,7 +95,7 @@ async def create_referral_relationship(user_id, referrer_id):
                 return
             
             # Vérifier si l'utilisateur est déjà parrainé par quelqu'un d'autre
-            other_referrer = db.referrals.find_one({
+            other_referrer = await asyncio.to_thread(db.referrals.find_one, {
                 "referred_id": str(user_id)
             })
             
@@ -112,7 +113,7 @@ async def create_referral_relationship(user_id, referrer_id):
                 "verification_date": None
             }
             
-            db.referrals.insert_one(new_referral)
+            await asyncio.to_thread(db.referrals.insert_one, new_referral)
             logger.info(f"Relation de parrainage créée: Parrain {referrer_id} -> Filleul {user_id}")
             
             # Lancer la vérification d'abonnement en arrière-plan avec un délai réduit
@@ -148,7 +149,8 @@ async def verify_and_update_referral(user_id, referrer_id):
             
             # Mettre à jour le statut de vérification
             current_time = datetime.now().isoformat()
-            result = db.referrals.update_one(
+            result = await asyncio.to_thread(
+                db.referrals.update_one,
                 {
                     "referrer_id": str(referrer_id),
                     "referred_id": str(user_id)
@@ -187,10 +189,9 @@ async def send_referral_notification(referrer_id):
         referrer_id (int): ID Telegram du parrain
     """
     try:
-        bot = Bot(token=TELEGRAM_TOKEN)
         referral_count = await count_referrals(referrer_id)
         
-        await bot.send_message(
+        await get_shared_bot().send_message(
             chat_id=referrer_id,
             text=f"🎉 *Félicitations!* Un nouvel utilisateur a utilisé votre lien et s'est abonné au canal.\n\n"
                  f"Vous avez maintenant *{referral_count}/{MAX_REFERRALS}* parrainages vérifiés.",
@@ -230,6 +231,30 @@ async def has_completed_referrals(user_id, username=None):
         logger.error(f"Erreur lors de la vérification des parrainages: {e}")
         return False
 
+def _load_referred_users(db, user_id):
+    """Lit les parrainages d'un utilisateur et les noms des filleuls (appels pymongo bloquants)."""
+    # Récupérer les parrainages
+    referrals = list(db.referrals.find({"referrer_id": str(user_id)}))
+    
+    referred_users = []
+    for referral in referrals:
+        referred_id = referral.get("referred_id")
+        if referred_id:
+            # Récupérer l'information de l'utilisateur parrainé
+            user_info = db.users.find_one({"user_id": referred_id})
+            
+            username = "Inconnu"
+            if user_info is not None and "username" in user_info:
+                username = user_info["username"]
+            
+            referred_users.append({
+                'id': referred_id,
+                'username': username,
+                'is_verified': referral.get("verified", False)
+            })
+    
+    return referred_users
+
 async def get_referred_users(user_id):
     """
     Récupère la liste des utilisateurs parrainés par un utilisateur.
@@ -253,27 +278,8 @@ async def get_referred_users(user_id):
             logger.error("Impossible de se connecter à la base de données pour récupérer les parrainages")
             return []
         
-        # Récupérer les parrainages
-        referrals = list(db.referrals.find({"referrer_id": str(user_id)}))
-        
-        referred_users = []
-        for referral in referrals:
-            referred_id = referral.get("referred_id")
-            if referred_id:
-                # Récupérer l'information de l'utilisateur parrainé
-                user_info = db.users.find_one({"user_id": referred_id})
-                
-                username = "Inconnu"
-                if user_info is not None and "username" in user_info:
-                    username = user_info["username"]
-                
-                referred_users.append({
-                    'id': referred_id,
-                    'username': username,
-                    'is_verified': referral.get("verified", False)
-                })
-        
-        return referred_users
+        # Toutes les lectures dans un seul thread (pymongo est synchrone)
+        return await asyncio.to_thread(_load_referred_users, db, user_id)
     
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des utilisateurs parrainés: {e}")
@@ -342,7 +348,7 @@ async def count_referrals(user_id):
             return 0
             
         # Compter les parrainages vérifiés
-        count = db.referrals.count_documents({
+        count = await asyncio.to_thread(db.referrals.count_documents, {
             "referrer_id": user_id_str,
             "verified": True
         })
@@ -390,10 +396,8 @@ async def check_channel_subscription(user_id, channel_id=None):
                 return is_subscribed
         
         # Si pas dans le cache ou expiré, vérifier via API Telegram
-        bot = Bot(token=TELEGRAM_TOKEN)
-        
         # Vérifier si l'utilisateur est membre du canal
-        chat_member = await bot.get_chat_member(chat_id=channel_id, user_id=user_id)
+        chat_member = await get_shared_bot().get_chat_member(chat_id=channel_id, user_id=user_id)
         
         # Les statuts qui indiquent une adhésion active au canal
         valid_statuses = ['creator', 'administrator', 'member']
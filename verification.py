@@ -7,9 +7,9 @@ from telegram.ext import ContextTypes
 
 # Importer les nouveaux modules optimisés
 from queue_manager import send_message_queued, edit_message_queued, get_system_load_status
-from gif_animations import send_verification_animation, send_game_animation
+from gif_animations import send_animated_message, send_verification_animation, send_game_animation
 from cache_system import (
-    get_cached_subscription_status, cache_subscription_status,
+    get_cached_subscription_status,
     get_cached_referral_count, cache_referral_count
 )
 
@@ -24,11 +24,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Délai (secondes) en dessous duquel le résultat d'une vérification est affiché sans animation
+VERIFICATION_FAST_DELAY = 0.3
+
+# Message d'abonnement non détecté (texte et boutons construits une seule fois)
+_SUBSCRIPTION_NOT_DETECTED_TEXT = (
+    "❌ *Abonnement non détecté*\n\n"
+    "Vous n'êtes pas encore abonné à [AL VE CAPITAL](https://t.me/alvecapitalofficiel).\n\n"
+    "*Instructions:*\n"
+    "1️⃣ Cliquez sur le bouton 'Rejoindre le canal'\n"
+    "2️⃣ Abonnez-vous au canal\n"
+    "3️⃣ Revenez ici et cliquez sur 'Vérifier à nouveau'"
+)
+_SUBSCRIPTION_RETRY_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📣 Rejoindre le canal", url="https://t.me/alvecapitalofficiel")],
+    [InlineKeyboardButton("🔍 Vérifier à nouveau", callback_data="verify_subscription")]
+])
+
+_ADMIN_ACCESS_TEXT = (
+    "🔑 *Accès administrateur*\n\n"
+    "Toutes les fonctionnalités sont débloquées en mode administrateur."
+)
+_SUBSCRIPTION_VERIFIED_TEXT = (
+    "✅ *Abonnement vérifié!*\n\n"
+    "Vous êtes bien abonné à [AL VE CAPITAL](https://t.me/alvecapitalofficiel)."
+)
+
+async def _show_verification_result(message, text, user_id, edit=False, reply_markup=None) -> None:
+    """Affiche un résultat de vérification en éditant le message ou en envoyant un nouveau."""
+    if edit and hasattr(message, 'edit_text'):
+        await edit_message_queued(
+            message=message,
+            text=text,
+            reply_markup=reply_markup,
+            parse_mode='Markdown',
+            disable_web_page_preview=True,
+            user_id=user_id
+        )
+        return
+    
+    await send_message_queued(
+        chat_id=message.chat_id,
+        text=text,
+        reply_markup=reply_markup,
+        parse_mode='Markdown',
+        disable_web_page_preview=True,
+        user_id=user_id
+    )
+
 # Vérification d'abonnement - version optimisée
 async def verify_subscription(message, user_id, username, context=None, edit=False) -> bool:
     """
     Vérifie si l'utilisateur est abonné au canal avec animation GIF et mise en cache.
-    Version optimisée qui réduit significativement les requêtes API.
+    Point d'entrée unique de /check et du bouton "verify_subscription".
     
     Args:
         message: Message Telegram pour répondre
@@ -42,161 +90,96 @@ async def verify_subscription(message, user_id, username, context=None, edit=Fal
     """
     # Vérifier si c'est un admin
     if is_admin(user_id, username):
-        if edit and hasattr(message, 'edit_text'):
-            await edit_message_queued(
-                message=message,
-                text="🔑 *Accès administrateur*\n\n"
-                    "Toutes les fonctionnalités sont débloquées en mode administrateur.",
-                parse_mode='Markdown',
-                user_id=user_id
-            )
-        else:
-            await send_message_queued(
-                chat_id=message.chat_id,
-                text="🔑 *Accès administrateur*\n\n"
-                    "Toutes les fonctionnalités sont débloquées en mode administrateur.",
-                parse_mode='Markdown',
-                user_id=user_id
-            )
+        await _show_verification_result(message, _ADMIN_ACCESS_TEXT, user_id, edit=edit)
         return True
     
-    # Vérifier d'abord le cache
-    cached_status = await get_cached_subscription_status(user_id)
-    if cached_status is not None:
-        logger.info(f"Statut d'abonnement trouvé en cache pour {user_id}: {cached_status}")
-        
-        if cached_status:
-            # Statut positif en cache, afficher directement la confirmation
-            if edit and hasattr(message, 'edit_text'):
-                await edit_message_queued(
-                    message=message,
-                    text="✅ *Abonnement vérifié!*\n\n"
-                        "Vous êtes bien abonné à [AL VE CAPITAL](https://t.me/alvecapitalofficiel).",
-                    parse_mode='Markdown',
-                    disable_web_page_preview=True,
-                    user_id=user_id
-                )
-            else:
-                await send_message_queued(
-                    chat_id=message.chat_id,
-                    text="✅ *Abonnement vérifié!*\n\n"
-                        "Vous êtes bien abonné à [AL VE CAPITAL](https://t.me/alvecapitalofficiel).",
-                    parse_mode='Markdown',
-                    disable_web_page_preview=True,
-                    user_id=user_id
-                )
-            
-            # Passer à la vérification du parrainage si le contexte est fourni
-            if context:
-                await verify_referral(message, user_id, username, context)
-                
-            return True
-        else:
-            # Statut négatif en cache, afficher message d'erreur
-            keyboard = [
-                [InlineKeyboardButton("📣 Rejoindre le canal", url="https://t.me/alvecapitalofficiel")],
-                [InlineKeyboardButton("🔍 Vérifier à nouveau", callback_data="verify_subscription")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            if edit and hasattr(message, 'edit_text'):
-                await edit_message_queued(
-                    message=message,
-                    text="❌ *Abonnement non détecté*\n\n"
-                        "Vous n'êtes pas encore abonné à [AL VE CAPITAL](https://t.me/alvecapitalofficiel).\n\n"
-                        "*Instructions:*\n"
-                        "1️⃣ Cliquez sur le bouton 'Rejoindre le canal'\n"
-                        "2️⃣ Abonnez-vous au canal\n"
-                        "3️⃣ Revenez ici et cliquez sur 'Vérifier à nouveau'",
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown',
-                    disable_web_page_preview=True,
-                    user_id=user_id
-                )
-            else:
-                await send_message_queued(
-                    chat_id=message.chat_id,
-                    text="❌ *Abonnement non détecté*\n\n"
-                        "Vous n'êtes pas encore abonné à [AL VE CAPITAL](https://t.me/alvecapitalofficiel).\n\n"
-                        "*Instructions:*\n"
-                        "1️⃣ Cliquez sur le bouton 'Rejoindre le canal'\n"
-                        "2️⃣ Abonnez-vous au canal\n"
-                        "3️⃣ Revenez ici et cliquez sur 'Vérifier à nouveau'",
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown',
-                    disable_web_page_preview=True,
-                    user_id=user_id
-                )
-            return False
-    
-    # Si pas en cache, faire la vérification effective avec animation GIF
-    # Utiliser l'animation GIF optimisée au lieu de l'animation textuelle
-    final_text_success = (
-        "✅ *Abonnement vérifié!*\n\n"
-        "Vous êtes bien abonné à [AL VE CAPITAL](https://t.me/alvecapitalofficiel)."
-    )
-    
-    final_text_failure = (
-        "❌ *Abonnement non détecté*\n\n"
-        "Vous n'êtes pas encore abonné à [AL VE CAPITAL](https://t.me/alvecapitalofficiel).\n\n"
-        "*Instructions:*\n"
-        "1️⃣ Cliquez sur le bouton 'Rejoindre le canal'\n"
-        "2️⃣ Abonnez-vous au canal\n"
-        "3️⃣ Revenez ici et cliquez sur 'Vérifier à nouveau'"
-    )
-    
-    # Effectuer la vérification API réelle
-    from database_adapter import check_user_subscription
-    is_subscribed = await check_user_subscription(user_id)
-    
-    # Mettre en cache le résultat pour 24 heures (ou la durée configurée)
-    await cache_subscription_status(user_id, is_subscribed)
+    from database_adapter import check_user_subscription, invalidate_user_subscription, get_local_subscription_status
     
-    if is_subscribed:
-        # Animation de succès
-        keyboard = None  # Pas de boutons pour le succès
-
-        # Envoi du message animé
-        await send_verification_animation(
-            message=message,
-            success=True,
-            final_text=final_text_success,
-            reply_markup=keyboard,
-            edit=edit,
-            user_id=user_id,
-            loading_duration=1.0  # Réduit la durée d'animation
-        )
+    # Abonnement déjà confirmé en cache (local, sinon partagé): affichage direct du résultat, sans animation
+    cached_status = get_local_subscription_status(user_id)
+    if cached_status is None:
+        cached_status = await get_cached_subscription_status(user_id)
+    if cached_status:
+        logger.info(f"Abonnement trouvé en cache pour {user_id}")
+        await _show_verification_result(message, _SUBSCRIPTION_VERIFIED_TEXT, user_id, edit=edit)
         
-        # Lancer la vérification du parrainage si le contexte est fourni
+        # Passer à la vérification du parrainage si le contexte est fourni
         if context:
             await verify_referral(message, user_id, username, context)
-            
         return True
-    else:
-        # Animation d'échec
-        keyboard = [
-            [InlineKeyboardButton("📣 Rejoindre le canal", url="https://t.me/alvecapitalofficiel")],
-            [InlineKeyboardButton("🔍 Vérifier à nouveau", callback_data="verify_subscription")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        # Envoi du message animé
-        await send_verification_animation(
+    
+    # Un statut négatif en cache est peut-être périmé (l'utilisateur demande à revérifier
+    # après s'être abonné): l'oublier dans tous les processus avant la vérification effective
+    if cached_status is False:
+        await invalidate_user_subscription(user_id)
+    
+    # Vérification effective lancée tout de suite (elle met aussi le résultat en cache)
+    check_task = asyncio.create_task(check_user_subscription(user_id))
+    try:
+        # Réponse rapide: résultat affiché directement, sans message de chargement
+        is_subscribed = await asyncio.wait_for(asyncio.shield(check_task), timeout=VERIFICATION_FAST_DELAY)
+    except asyncio.TimeoutError:
+        # Vérification lente: animation de chargement pendant que la vérification se poursuit
+        message = await send_animated_message(
             message=message,
-            success=False,
-            final_text=final_text_failure,
-            reply_markup=reply_markup,
+            animation_type="verification",
+            animation_subtype="loading",
+            text="🔍 *Vérification en cours...*",
             edit=edit,
             user_id=user_id,
-            loading_duration=1.0  # Réduit la durée d'animation
+            disable_notification=True
         )
-        return False
+        edit = True
+        is_subscribed = await check_task
+    
+    await _show_verification_result(
+        message,
+        _SUBSCRIPTION_VERIFIED_TEXT if is_subscribed else _SUBSCRIPTION_NOT_DETECTED_TEXT,
+        user_id,
+        edit=edit,
+        reply_markup=None if is_subscribed else _SUBSCRIPTION_RETRY_MARKUP
+    )
+    
+    # Lancer la vérification du parrainage si le contexte est fourni
+    if is_subscribed and context:
+        await verify_referral(message, user_id, username, context)
+    
+    return is_subscribed
+
+# Menu des jeux, joint au message de confirmation du parrainage (un seul envoi)
+_GAMES_MENU_TEXT = (
+    "🎮 *Menu des jeux disponibles*\n\n"
+    "Sélectionnez un jeu pour commencer:"
+)
+_GAMES_MENU_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🏆 FIFA 4x4 Predictor", callback_data="game_fifa")],
+    [InlineKeyboardButton("🍎 Apple of Fortune", callback_data="game_apple")],
+    [InlineKeyboardButton("🃏 Baccarat", callback_data="game_baccarat")]
+])
+_REFERRAL_PENDING_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔗 Obtenir mon lien de parrainage", callback_data="get_referral_link")],
+    [InlineKeyboardButton("✅ Vérifier à nouveau", callback_data="verify_referral")]
+])
+_TPL_REFERRAL_COMPLETED = (
+    "✅ *Parrainage complété!*\n\n"
+    "Vous avez atteint votre objectif de {max} parrainage(s).\n"
+    "Toutes les fonctionnalités sont désormais débloquées.\n\n"
+) + _GAMES_MENU_TEXT
+_TPL_REFERRAL_PENDING = (
+    "⏳ *Parrainage en cours - {count}/{max}*\n\n"
+    "Vous avez actuellement {count} parrainage(s) sur {max} requis.\n\n"
+    "Partagez votre lien de parrainage pour débloquer toutes les fonctionnalités."
+)
+_REFERRAL_CHECK_ERROR_TEXT = (
+    "❌ *Erreur lors de la vérification*\n\n"
+    "Une erreur est survenue lors de la vérification de votre parrainage. Veuillez réessayer."
+)
 
 # Vérification de parrainage - version optimisée
 async def verify_referral(message, user_id, username, context=None, edit=False) -> bool:
     """
     Vérifie si l'utilisateur a complété ses parrainages avec animation GIF et mise en cache.
-    Version optimisée qui réduit significativement les requêtes API.
+    En cas de succès, la confirmation et le menu des jeux partent dans un seul message.
     
     Args:
         message: Message Telegram pour répondre
@@ -208,131 +191,35 @@ async def verify_referral(message, user_id, username, context=None, edit=False)
     Returns:
         bool: True si l'utilisateur a complété ses parrainages ou est admin, False sinon
     """
-    # Récupérer MAX_REFERRALS
-    from referral_system import get_max_referrals
-    max_referrals = await get_max_referrals()
-    
     # Vérifier si c'est un admin
     if is_admin(user_id, username):
-        if edit and hasattr(message, 'edit_text'):
-            await edit_message_queued(
-                message=message,
-                text="🔑 *Accès administrateur*\n\n"
-                    "Toutes les fonctionnalités sont débloquées en mode administrateur.",
-                parse_mode='Markdown',
-                user_id=user_id
-            )
-        else:
-            await send_message_queued(
-                chat_id=message.chat_id,
-                text="🔑 *Accès administrateur*\n\n"
-                    "Toutes les fonctionnalités sont débloquées en mode administrateur.",
-                parse_mode='Markdown',
-                user_id=user_id
-            )
-            
-        # Créer un bouton direct pour chaque jeu (contournement pour éviter les erreurs)
-        keyboard = [
-            [InlineKeyboardButton("🏆 FIFA 4x4 Predictor", callback_data="game_fifa")],
-            [InlineKeyboardButton("🍎 Apple of Fortune", callback_data="game_apple")],
-            [InlineKeyboardButton("🃏 Baccarat", callback_data="game_baccarat")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        # Message avec boutons directs pour les administrateurs
-        try:
-            await send_message_queued(
-                chat_id=message.chat_id,
-                text="🎮 *Menu des jeux disponibles*\n\n"
-                    "Sélectionnez un jeu pour commencer:",
-                parse_mode='Markdown',
-                reply_markup=reply_markup,
-                user_id=user_id
-            )
-        except Exception as e:
-            logger.error(f"Erreur lors de l'affichage des boutons de jeu: {e}")
-            
+        await _show_verification_result(
+            message, f"{_ADMIN_ACCESS_TEXT}\n\n{_GAMES_MENU_TEXT}", user_id,
+            edit=edit, reply_markup=_GAMES_MENU_MARKUP
+        )
         return True
     
-    # Vérifier d'abord le cache
+    # Récupérer MAX_REFERRALS
+    from referral_system import get_max_referrals
+    max_referrals = await get_max_referrals()
+    
+    # Vérifier d'abord le cache: affichage direct du résultat, sans animation
     cached_count = await get_cached_referral_count(user_id)
     if cached_count is not None:
         logger.info(f"Nombre de parrainages trouvé en cache pour {user_id}: {cached_count}")
         
-        has_completed = cached_count >= max_referrals
-        
-        if has_completed:
-            # Nombre suffisant en cache, afficher directement la confirmation
-            if edit and hasattr(message, 'edit_text'):
-                await edit_message_queued(
-                    message=message,
-                    text="✅ *Parrainage complété!*\n\n"
-                        f"Vous avez atteint votre objectif de {max_referrals} parrainage(s).\n"
-                        "Toutes les fonctionnalités sont désormais débloquées.",
-                    parse_mode='Markdown',
-                    user_id=user_id
-                )
-            else:
-                await send_message_queued(
-                    chat_id=message.chat_id,
-                    text="✅ *Parrainage complété!*\n\n"
-                        f"Vous avez atteint votre objectif de {max_referrals} parrainage(s).\n"
-                        "Toutes les fonctionnalités sont désormais débloquées.",
-                    parse_mode='Markdown',
-                    user_id=user_id
-                )
-            
-            # Créer un bouton direct pour chaque jeu
-            keyboard = [
-                [InlineKeyboardButton("🏆 FIFA 4x4 Predictor", callback_data="game_fifa")],
-                [InlineKeyboardButton("🍎 Apple of Fortune", callback_data="game_apple")],
-                [InlineKeyboardButton("🃏 Baccarat", callback_data="game_baccarat")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            # Message avec boutons directs
-            try:
-                await send_message_queued(
-                    chat_id=message.chat_id,
-                    text="🎮 *Menu des jeux disponibles*\n\n"
-                        "Sélectionnez un jeu pour commencer:",
-                    parse_mode='Markdown',
-                    reply_markup=reply_markup,
-                    user_id=user_id
-                )
-            except Exception as e:
-                logger.error(f"Erreur lors de l'affichage des boutons de jeu: {e}")
-            
+        if cached_count >= max_referrals:
+            await _show_verification_result(
+                message, _TPL_REFERRAL_COMPLETED.format(max=max_referrals), user_id,
+                edit=edit, reply_markup=_GAMES_MENU_MARKUP
+            )
             return True
-        else:
-            # Nombre insuffisant en cache, afficher message en cours
-            keyboard = [
-                [InlineKeyboardButton("🔗 Obtenir mon lien de parrainage", callback_data="get_referral_link")],
-                [InlineKeyboardButton("✅ Vérifier à nouveau", callback_data="verify_referral")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            if edit and hasattr(message, 'edit_text'):
-                await edit_message_queued(
-                    message=message,
-                    text=f"⏳ *Parrainage en cours - {cached_count}/{max_referrals}*\n\n"
-                        f"Vous avez actuellement {cached_count} parrainage(s) sur {max_referrals} requis.\n\n"
-                        f"Partagez votre lien de parrainage pour débloquer toutes les fonctionnalités.",
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown',
-                    user_id=user_id
-                )
-            else:
-                await send_message_queued(
-                    chat_id=message.chat_id,
-                    text=f"⏳ *Parrainage en cours - {cached_count}/{max_referrals}*\n\n"
-                        f"Vous avez actuellement {cached_count} parrainage(s) sur {max_referrals} requis.\n\n"
-                        f"Partagez votre lien de parrainage pour débloquer toutes les fonctionnalités.",
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown',
-                    user_id=user_id
-                )
-            return False
+        
+        await _show_verification_result(
+            message, _TPL_REFERRAL_PENDING.format(count=cached_count, max=max_referrals), user_id,
+            edit=edit, reply_markup=_REFERRAL_PENDING_MARKUP
+        )
+        return False
     
     # Si pas en cache, faire la vérification effective avec animation GIF
     try:
@@ -347,118 +234,73 @@ async def verify_referral(message, user_id, username, context=None, edit=False)
         has_completed = referral_count >= max_referrals
         
         if has_completed:
-            # Message final de succès
-            final_text_success = (
-                "✅ *Parrainage complété!*\n\n"
-                f"Vous avez atteint votre objectif de {max_referrals} parrainage(s).\n"
-                "Toutes les fonctionnalités sont désormais débloquées."
-            )
-            
-            # Animation de succès
-            await send_verification_animation(
-                message=message,
-                success=True,
-                final_text=final_text_success,
-                edit=edit,
-                user_id=user_id,
-                loading_duration=1.0  # Réduit la durée d'animation
-            )
-            
-            # Créer un bouton direct pour chaque jeu
-            keyboard = [
-                [InlineKeyboardButton("🏆 FIFA 4x4 Predictor", callback_data="game_fifa")],
-                [InlineKeyboardButton("🍎 Apple of Fortune", callback_data="game_apple")],
-                [InlineKeyboardButton("🃏 Baccarat", callback_data="game_baccarat")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            # Message avec boutons directs
-            try:
-                await send_message_queued(
-                    chat_id=message.chat_id,
-                    text="🎮 *Menu des jeux disponibles*\n\n"
-                        "Sélectionnez un jeu pour commencer:",
-                    parse_mode='Markdown',
-                    reply_markup=reply_markup,
-                    user_id=user_id
-                )
-            except Exception as e:
-                logger.error(f"Erreur lors de l'affichage des boutons de jeu: {e}")
-            
-            return True
+            final_text = _TPL_REFERRAL_COMPLETED.format(max=max_referrals)
+            reply_markup = _GAMES_MENU_MARKUP
         else:
-            # Message indiquant le nombre actuel de parrainages
-            keyboard = [
-                [InlineKeyboardButton("🔗 Obtenir mon lien de parrainage", callback_data="get_referral_link")],
-                [InlineKeyboardButton("✅ Vérifier à nouveau", callback_data="verify_referral")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            final_text_failure = (
-                f"⏳ *Parrainage en cours - {referral_count}/{max_referrals}*\n\n"
-                f"Vous avez actuellement {referral_count} parrainage(s) sur {max_referrals} requis.\n\n"
-                f"Partagez votre lien de parrainage pour débloquer toutes les fonctionnalités."
-            )
-            
-            # Animation d'attente
-            await send_verification_animation(
-                message=message,
-                success=False,
-                final_text=final_text_failure,
-                reply_markup=reply_markup,
-                edit=edit,
-                user_id=user_id,
-                loading_duration=1.0  # Réduit la durée d'animation
-            )
-            return False
+            final_text = _TPL_REFERRAL_PENDING.format(count=referral_count, max=max_referrals)
+            reply_markup = _REFERRAL_PENDING_MARKUP
+        
+        await send_verification_animation(
+            message=message,
+            success=has_completed,
+            final_text=final_text,
+            reply_markup=reply_markup,
+            edit=edit,
+            user_id=user_id,
+            loading_duration=1.0  # Réduit la durée d'animation
+        )
+        return has_completed
             
     except Exception as e:
         logger.error(f"Erreur lors de la vérification des parrainages: {e}")
-        if edit and hasattr(message, 'edit_text'):
-            await edit_message_queued(
-                message=message,
-                text="❌ *Erreur lors de la vérification*\n\n"
-                    "Une erreur est survenue lors de la vérification de votre parrainage. Veuillez réessayer.",
-                parse_mode='Markdown',
-                user_id=user_id
-            )
-        else:
-            await send_message_queued(
-                chat_id=message.chat_id,
-                text="❌ *Erreur lors de la vérification*\n\n"
-                    "Une erreur est survenue lors de la vérification de votre parrainage. Veuillez réessayer.",
-                parse_mode='Markdown',
-                user_id=user_id
-            )
+        await _show_verification_result(message, _REFERRAL_CHECK_ERROR_TEXT, user_id, edit=edit)
         return False
 
-# Message standard quand l'abonnement est requis - version optimisée
-async def send_subscription_required(message) -> None:
+# Message standard quand l'abonnement est requis (texte et boutons construits une seule fois)
+_SUBSCRIPTION_REQUIRED_TEXT = (
+    "⚠️ *Abonnement requis*\n\n"
+    "Pour utiliser cette fonctionnalité, vous devez être abonné à notre canal.\n\n"
+    "*Instructions:*\n"
+    "1️⃣ Rejoignez [AL VE CAPITAL](https://t.me/alvecapitalofficiel)\n"
+    "2️⃣ Cliquez sur '🔍 Vérifier mon abonnement'"
+)
+_SUBSCRIPTION_REQUIRED_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📣 Rejoindre le canal", url="https://t.me/alvecapitalofficiel")],
+    [InlineKeyboardButton("🔍 Vérifier mon abonnement", callback_data="verify_subscription")]
+])
+
+# Arguments communs à l'envoi et à l'édition du message "abonnement requis"
+_SUBSCRIPTION_REQUIRED_KW = dict(
+    text=_SUBSCRIPTION_REQUIRED_TEXT,
+    reply_markup=_SUBSCRIPTION_REQUIRED_MARKUP,
+    parse_mode='Markdown',
+    disable_web_page_preview=True,
+    user_id=None,  # No user tracking for standard messages
+    high_priority=False  # Lower priority for standard messages
+)
+
+async def send_subscription_required(message, edit=False) -> None:
     """
-    Envoie un message indiquant que l'abonnement est nécessaire.
+    Envoie (ou affiche par édition) le message indiquant que l'abonnement est nécessaire.
     Version optimisée utilisant la file d'attente.
     """
-    keyboard = [
-        [InlineKeyboardButton("📣 Rejoindre le canal", url="https://t.me/alvecapitalofficiel")],
-        [InlineKeyboardButton("🔍 Vérifier mon abonnement", callback_data="verify_subscription")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    if edit and hasattr(message, 'edit_text'):
+        await edit_message_queued(message=message, **_SUBSCRIPTION_REQUIRED_KW)
+        return
     
-    await send_message_queued(
-        chat_id=message.chat_id,
-        text="⚠️ *Abonnement requis*\n\n"
-            "Pour utiliser cette fonctionnalité, vous devez être abonné à notre canal.\n\n"
-            "*Instructions:*\n"
-            "1️⃣ Rejoignez [AL VE CAPITAL](https://t.me/alvecapitalofficiel)\n"
-            "2️⃣ Cliquez sur '🔍 Vérifier mon abonnement'",
-        reply_markup=reply_markup,
-        parse_mode='Markdown',
-        disable_web_page_preview=True,
-        user_id=None,  # No user tracking for standard messages
-        high_priority=False  # Lower priority for standard messages
-    )
+    await send_message_queued(chat_id=message.chat_id, **_SUBSCRIPTION_REQUIRED_KW)
+
+# Message standard quand le parrainage est requis (modèle et boutons construits une seule fois)
+_TPL_REFERRAL_REQUIRED = (
+    "⚠️ *Parrainage requis*\n\n"
+    "Pour utiliser cette fonctionnalité, vous devez parrainer {max} personne(s).\n\n"
+    "Partagez votre lien de parrainage avec vos amis pour débloquer toutes les fonctionnalités."
+)
+_REFERRAL_REQUIRED_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔗 Obtenir mon lien de parrainage", callback_data="get_referral_link")],
+    [InlineKeyboardButton("✅ Vérifier mon parrainage", callback_data="verify_referral")]
+])
 
-# Message standard quand le parrainage est requis - version optimisée
 async def send_referral_required(message) -> None:
     """
     Envoie un message indiquant que le parrainage est nécessaire.
@@ -467,25 +309,17 @@ async def send_referral_required(message) -> None:
     from referral_system import get_max_referrals
     max_referrals = await get_max_referrals()
     
-    keyboard = [
-        [InlineKeyboardButton("🔗 Obtenir mon lien de parrainage", callback_data="get_referral_link")],
-        [InlineKeyboardButton("✅ Vérifier mon parrainage", callback_data="verify_referral")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     await send_message_queued(
         chat_id=message.chat_id,
-        text="⚠️ *Parrainage requis*\n\n"
-            f"Pour utiliser cette fonctionnalité, vous devez parrainer {max_referrals} personne(s).\n\n"
-            "Partagez votre lien de parrainage avec vos amis pour débloquer toutes les fonctionnalités.",
-        reply_markup=reply_markup,
+        text=_TPL_REFERRAL_REQUIRED.format(max=max_referrals),
+        reply_markup=_REFERRAL_REQUIRED_MARKUP,
         parse_mode='Markdown',
         user_id=None,  # No user tracking for standard messages
         high_priority=False  # Lower priority for standard messages
     )
 
 # Vérification complète avant d'accéder à une fonctionnalité - version optimisée
-async def verify_all_requirements(user_id, username, message, context=None) -> bool:
+async def verify_all_requirements(user_id, username, message, context=None, edit=False) -> bool:
     """
     Vérifie toutes les conditions d'accès (abonnement + parrainage) de manière optimisée.
     Utilise le cache et minimise les requêtes API.
@@ -495,6 +329,7 @@ async def verify_all_requirements(user_id, username, message, context=None) -> b
         username (str): Nom d'utilisateur Telegram
         message: Message Telegram pour répondre
         context: Contexte de conversation Telegram (optionnel)
+        edit (bool): Si True, le message "abonnement requis" remplace le contenu de `message`
         
     Returns:
         bool: True si l'utilisateur a accès (admin ou abonné+parrainé), False sinon
@@ -504,18 +339,12 @@ async def verify_all_requirements(user_id, username, message, context=None) -> b
         logger.info(f"Vérification contournée pour l'administrateur {username} (ID: {user_id})")
         return True
     
-    # Vérifier l'abonnement en utilisant le cache
-    cached_status = await get_cached_subscription_status(user_id)
-    if cached_status is not None:
-        is_subscribed = cached_status
-    else:
-        # Si pas en cache, faire la vérification API et mettre en cache
-        from database_adapter import check_user_subscription
-        is_subscribed = await check_user_subscription(user_id)
-        await cache_subscription_status(user_id, is_subscribed)
+    # Vérifier l'abonnement (cache local, cache partagé puis API)
+    from database_adapter import check_user_subscription
+    is_subscribed = await check_user_subscription(user_id)
     
     if not is_subscribed:
-        await send_subscription_required(message)
+        await send_subscription_required(message, edit=edit)
         return False
     
     # Vérifier le parrainage en utilisant le cache
@@ -535,6 +364,18 @@ async def verify_all_requirements(user_id, username, message, context=None) -> b
     
     return True
 
+# Menu principal des jeux (les boutons sont ceux de _GAMES_MENU_MARKUP)
+_MAIN_MENU_TEXT = (
+    "🎮 *FIFA GAMES - Menu Principal* 🎮\n\n"
+    "Choisissez un jeu pour obtenir des prédictions :\n\n"
+    "🏆 *FIFA 4x4 Predictor*\n"
+    "_Prédictions précises basées sur des statistiques réelles_\n\n"
+    "🍎 *Apple of Fortune*\n"
+    "_Trouvez la bonne pomme grâce à notre système prédictif_\n\n"
+    "🃏 *Baccarat*\n"
+    "_Anticipez le gagnant avec notre technologie d'analyse_"
+)
+
 # Fonction pour afficher le menu principal des jeux - version optimisée
 async def show_games_menu(message, context) -> None:
     """
@@ -542,25 +383,9 @@ async def show_games_menu(message, context) -> None:
     Version optimisée utilisant la file d'attente.
     """
     try:
-        # Texte du menu simplifié
-        menu_text = (
-            "🎮 *FIFA GAMES - Menu Principal* 🎮\n\n"
-            "Choisissez un jeu pour obtenir des prédictions :\n\n"
-            "🏆 *FIFA 4x4 Predictor*\n"
-            "_Prédictions précises basées sur des statistiques réelles_\n\n"
-            "🍎 *Apple of Fortune*\n"
-            "_Trouvez la bonne pomme grâce à notre système prédictif_\n\n"
-            "🃏 *Baccarat*\n"
-            "_Anticipez le gagnant avec notre technologie d'analyse_"
-        )
-        
-        # Boutons pour accéder aux différents jeux
-        keyboard = [
-            [InlineKeyboardButton("🏆 FIFA 4x4 Predictor", callback_data="game_fifa")],
-            [InlineKeyboardButton("🍎 Apple of Fortune", callback_data="game_apple")],
-            [InlineKeyboardButton("🃏 Baccarat", callback_data="game_baccarat")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # Texte et boutons du menu (construits une seule fois)
+        menu_text = _MAIN_MENU_TEXT
+        reply_markup = _GAMES_MENU_MARKUP
         
         # Message avec le menu
         if hasattr(message, 'edit_text'):
@@ -581,14 +406,8 @@ async def show_games_menu(message, context) -> None:
             )
             
     except Exception as e:
-        # Log complet de l'erreur
-        import traceback
-        error_trace = traceback.format_exc()
-        logger.error(f"Erreur détaillée dans show_games_menu: {error_trace}")
-        
-        # Message d'erreur avec plus de détails
-        error_message = f"Une erreur s'est produite lors du chargement du menu: {str(e)}"
-        logger.error(error_message)
+        # Log complet de l'erreur (trace incluse)
+        logger.error(f"Une erreur s'est produite lors du chargement du menu: {e}", exc_info=True)
         
         try:
             await send_message_queued(